@@ -0,0 +1,250 @@
+# agentBatch.py - Many robots and middle layers simulated at once
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Simulates many robots with their middle layers at once, with NumPy
+arrays in place of one Rob_body per robot."""
+
+import math
+import numpy as np
+from agentWallGrid import Wall_grid
+
+class Rob_batch(object):
+    """A batch of n robots, each a Rob_body driven by a Rob_middle_layer,
+    simulated with NumPy arrays: robot i is at (x[i],y[i]) facing dir[i]
+    degrees, whisker[i] is its whisker percept and crashed[i] is True once
+    it has hit a wall. countleft and countright are the turn counts of the
+    middle layers, which steer uses as Rob_middle_layer.steer does.
+    walls is a collection of ((x0,y0),(x1,y1)) segments, as in Rob_env.
+    init_poses is a list (or n*3 array) of (x, y, dir) start poses.
+
+    go_to(targets, timeout) does what Rob_middle_layer.do does for each
+    robot, including giving up with 'Interupt' whenever the remaining number
+    of steps is a multiple of 175. The arithmetic is the same as for one
+    robot; the cosines and sines of the (few) directions are computed with
+    math, so the trajectories match the scalar simulation.
+
+    If there are more than grid_threshold walls, or cell_size is given,
+    the walls are also kept in an agentWallGrid.Wall_grid, and each
+    segment is only tested against the walls in the (at most four) grid
+    cells around it. Walls can be added with add_wall().
+    """
+    turning_angle = 18      # degrees that a left makes
+    whisker_length = 6      # length of the whisker
+    whisker_angle = 30      # angle of whisker relative to robot
+    straight_angle = 11     # angle that is close enough to straight ahead
+    close_threshold = 2     # distance that is close enough to arrived
+    chunk_size = 1<<20      # largest number of (robot, wall) pairs tested at once
+    grid_threshold = 64     # more walls than this are indexed with a Wall_grid
+
+    def __init__(self, walls, init_poses, cell_size=None):
+        walls = list(walls)
+        self.walls = np.array([[x0, y0, x1, y1] for ((x0,y0),(x1,y1)) in walls],
+                              dtype=float).reshape(-1, 4)
+        self.grid = None
+        if cell_size is not None or len(walls) > self.grid_threshold:
+            # cells at least as long as the whisker, so a segment spans at most 2x2 cells
+            self.grid = Wall_grid(walls, max(cell_size or 10, self.whisker_length+1))
+        self.table = None
+        poses = np.array(init_poses, dtype=float).reshape(-1, 3)
+        self.x, self.y, self.dir = poses[:,0].copy(), poses[:,1].copy(), poses[:,2].copy()
+        n = len(poses)
+        self.crashed = np.zeros(n, dtype=bool)
+        self.countleft = np.zeros(n, dtype=int)
+        self.countright = np.zeros(n, dtype=int)
+        self.close_threshold_squared = self.close_threshold**2
+        self.whisker = self.whiskers(np.arange(n))
+
+    def __len__(self):
+        return len(self.x)
+
+    def unit_vectors(self, angles):
+        """returns the arrays of cos and sin of angles (in degrees)"""
+        values, inverse = np.unique(angles, return_inverse=True)
+        radians = [float(a)*math.pi/180 for a in values]
+        return (np.array([math.cos(r) for r in radians])[inverse],
+                np.array([math.sin(r) for r in radians])[inverse])
+
+    def add_wall(self, wall):
+        """adds wall, a ((x0,y0),(x1,y1)) segment"""
+        ((x0,y0),(x1,y1)) = wall
+        self.walls = np.vstack([self.walls, [[x0, y0, x1, y1]]])
+        if self.grid is not None:
+            self.grid.add(wall)
+            self.table = None
+
+    def grid_table(self):
+        """returns (keys, offsets, indexes, i0, j0, rows), the cells of the
+        grid in compressed sparse rows: the cells holding walls are numbered
+        (i-i0)*rows+(j-j0), keys is the sorted array of their numbers and the
+        indexes of the walls in the cell numbered keys[c] are
+        indexes[offsets[c]:offsets[c+1]]. It takes space linear in the
+        number of (wall, cell) pairs, however the walls are spread."""
+        if self.table is None:
+            cells = {cell: ks for (cell, ks) in self.grid.cells.items() if ks}
+            if cells:
+                i0, j0 = min(i for (i,j) in cells), min(j for (i,j) in cells)
+                rows = max(j for (i,j) in cells)-j0+1
+            else:
+                i0 = j0 = 0
+                rows = 1
+            order = sorted(((i-i0)*rows+(j-j0), ks) for ((i,j), ks) in cells.items())
+            keys = np.array([key for (key, _) in order], dtype=np.int64)
+            offsets = np.zeros(len(order)+1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(ks) for (_, ks) in order])
+            indexes = np.array([k for (_, ks) in order for k in ks], dtype=np.int64)
+            self.table = (keys, offsets, indexes, i0, j0, rows)
+        return self.table
+
+    def hits_wall(self, x0, y0, x1, y1):
+        """returns a boolean array: whether the i-th segment (x0[i],y0[i])
+        to (x1[i],y1[i]) intersects any wall"""
+        hit = np.zeros(len(x0), dtype=bool)
+        if len(self.walls) == 0:
+            return hit
+        if self.grid is not None:
+            return self.grid_hits_wall(x0, y0, x1, y1)
+        step = max(1, self.chunk_size//len(self.walls))
+        for begin in range(0, len(x0), step):
+            part = slice(begin, begin+step)
+            hit[part] = segments_intersect(x0[part], y0[part], x1[part], y1[part],
+                                           self.walls).any(axis=1)
+        return hit
+
+    def grid_hits_wall(self, x0, y0, x1, y1):
+        """hits_wall, testing only the walls in the grid cells overlapping
+        the bounding box of each segment (widened as in Wall_grid)"""
+        (keys, offsets, indexes, i0, j0, rows) = self.grid_table()
+        hit = np.zeros(len(x0), dtype=bool)
+        if len(keys) == 0:
+            return hit
+        size, eps = self.grid.cell_size, self.grid.eps
+        cols = [np.floor((np.minimum(x0, x1)-eps)/size).astype(np.int64)-i0,
+                np.floor((np.maximum(x0, x1)+eps)/size).astype(np.int64)-i0]
+        rows_of = [np.floor((np.minimum(y0, y1)-eps)/size).astype(np.int64)-j0,
+                   np.floor((np.maximum(y0, y1)+eps)/size).astype(np.int64)-j0]
+        # the (segment, first, count) of the walls in each cell to test
+        segs, firsts, counts = [], [], []
+        for (a, i) in enumerate(cols):
+            for (b, j) in enumerate(rows_of):
+                key = i*rows+j
+                c = np.minimum(np.searchsorted(keys, key), len(keys)-1)
+                found = (i >= 0) & (j >= 0) & (j < rows) & (keys[c] == key)
+                if a:
+                    found &= cols[1] != cols[0]     # a cell only once
+                if b:
+                    found &= rows_of[1] != rows_of[0]
+                segs.append(np.nonzero(found)[0])
+                firsts.append(offsets[c[found]])
+                counts.append(offsets[c[found]+1]-offsets[c[found]])
+        counts = np.concatenate(counts)
+        seg = np.repeat(np.concatenate(segs), counts)
+        # position in indexes of each (segment, wall) pair
+        ends = np.cumsum(counts)
+        at = np.arange(len(seg)) + np.repeat(np.concatenate(firsts)-(ends-counts), counts)
+        walls = self.walls[indexes[at]]
+        hit[seg[pairs_intersect(x0[seg], y0[seg], x1[seg], y1[seg],
+                                walls[:,0], walls[:,1], walls[:,2], walls[:,3])]] = True
+        return hit
+
+    def whiskers(self, robots):
+        """returns the whisker percepts of the robots (an index array)"""
+        (c, s) = self.unit_vectors(self.dir[robots]-self.whisker_angle)
+        x, y = self.x[robots], self.y[robots]
+        return self.hits_wall(x, y, x+self.whisker_length*c, y+self.whisker_length*s)
+
+    def steer(self, robots, tx, ty):
+        """returns the turns (1 left, 0 straight, -1 right) of the middle
+        layers of robots (an index array) going to (tx,ty), and updates their
+        turn counts"""
+        whisker = self.whisker[robots]
+        rx, ry = self.x[robots], self.y[robots]
+        dx, dy = tx-rx, ty-ry
+        goal_dir = np.arccos(dx/np.sqrt(dx*dx+dy*dy))*180/math.pi
+        goal_dir = np.where(ry > ty, -goal_dir, goal_dir)
+        goal_from_rob = (goal_dir - self.dir[robots]+540)%360-180
+        left, right = self.countleft[robots], self.countright[robots]
+        turn_left = whisker | ((goal_from_rob > self.straight_angle) & (right == left))
+        turn_right = ~turn_left & ((goal_from_rob < -self.straight_angle) | (right < left))
+        self.countleft[robots] += turn_left
+        self.countright[robots] += turn_right
+        return turn_left.astype(int) - turn_right
+
+    def move(self, robots, turns):
+        """moves the robots (an index array) that have not crashed, turning
+        as given, as Rob_body.do does, and updates their whisker percepts"""
+        moving = robots[~self.crashed[robots]]
+        turns = turns[~self.crashed[robots]]
+        self.dir[moving] = (self.dir[moving] + turns*self.turning_angle + 360)%360
+        (c, s) = self.unit_vectors(self.dir[moving])
+        x, y = self.x[moving], self.y[moving]
+        x_new, y_new = x+c, y+s
+        self.crashed[moving] |= self.hits_wall(x, y, x_new, y_new)
+        self.x[moving], self.y[moving] = x_new, y_new
+        self.whisker[robots] = self.whiskers(robots)
+
+    def close_enough(self, robots, tx, ty):
+        """returns whether each robot in robots is close to (tx,ty)"""
+        return (tx-self.x[robots])**2 + (ty-self.y[robots])**2 <= self.close_threshold_squared
+
+    def go_to(self, target_pos, timeout=None):
+        """moves every robot towards target_pos, an (x,y) pair or an n*2
+        array of a target for each robot, for at most timeout steps.
+        Returns an object array of what Rob_middle_layer.do would return
+        under 'arrived' for each robot: True, False or 'Interupt'.
+        """
+        targets = np.broadcast_to(np.array(target_pos, dtype=float), (len(self), 2))
+        result = np.full(len(self), False, dtype=object)
+        remaining = -1 if timeout is None else timeout      # -1 will never reach 0
+        robots = np.arange(len(self))
+        arrived = self.close_enough(robots, targets[:,0], targets[:,1])
+        result[arrived] = True
+        robots = robots[~arrived]
+        while len(robots) and remaining != 0:
+            if remaining%175 == 0:
+                result[robots] = 'Interupt'
+                break
+            tx, ty = targets[robots,0], targets[robots,1]
+            self.move(robots, self.steer(robots, tx, ty))
+            remaining -= 1
+            arrived = self.close_enough(robots, tx, ty)
+            result[robots[arrived]] = True
+            robots = robots[~arrived]
+        return result
+
+    def visit(self, positions, timeout=500):
+        """goes to each of the positions in turn, as Rob_top_layer.do does.
+        Returns an n*len(positions) object array of the go_to results."""
+        return np.stack([self.go_to(pos, timeout) for pos in positions], axis=1)
+
+def segments_intersect(x0a, y0a, x1a, y1a, walls):
+    """returns the len(x0a)*len(walls) boolean array of whether the segment
+    (x0a[i],y0a[i]) to (x1a[i],y1a[i]) intersects walls[j] = (x0,y0,x1,y1).
+    It is line_segments_intersect of agentEnv applied to every pair whose
+    bounding boxes (widened by margin, so rounding can't matter) overlap."""
+    margin = 1e-6
+    hit = ((np.minimum(x0a, x1a)[:,None] <= np.maximum(walls[:,0], walls[:,2])+margin)
+           & (np.maximum(x0a, x1a)[:,None] >= np.minimum(walls[:,0], walls[:,2])-margin)
+           & (np.minimum(y0a, y1a)[:,None] <= np.maximum(walls[:,1], walls[:,3])+margin)
+           & (np.maximum(y0a, y1a)[:,None] >= np.minimum(walls[:,1], walls[:,3])-margin))
+    (i, j) = np.nonzero(hit)
+    hit[i, j] = pairs_intersect(x0a[i], y0a[i], x1a[i], y1a[i],
+                                walls[j,0], walls[j,1], walls[j,2], walls[j,3])
+    return hit
+
+def pairs_intersect(x0a, y0a, x1a, y1a, x0b, y0b, x1b, y1b):
+    """returns the boolean array of whether segment a[i] = (x0a[i],y0a[i]) to
+    (x1a[i],y1a[i]) intersects segment b[i], computed as
+    line_segments_intersect of agentEnv does"""
+    da, db = x1a-x0a, x1b-x0b
+    ea, eb = y1a-y0a, y1b-y0b
+    denom = db*ea-eb*da
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cb = (da*(y0b-y0a)-ea*(x0b-x0a))/denom  # position along line b
+        ca = (db*(y0b-y0a)-eb*(x0b-x0a))/denom  # position along line a
+    return (denom != 0) & (cb >= 0) & (cb <= 1) & (ca >= 0) & (ca <= 1)
+
+# example:
+# starts = [(x, y, d) for x in range(-20, 20, 2) for y in range(-20, 20, 2) for d in range(0, 360, 36)]
+# robots = Rob_batch({((20,0),(30,20)), ((70,-5),(70,25))}, starts)
+# results = robots.visit([(100,10), (101,51)])
+# (results == True).mean(axis=0)   # fraction of the robots arriving at each
@@ -0,0 +1,62 @@
+# agentBenchmark.py - Step times of Rob_body_indexed among many walls
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Times a robot circling inside a box as walls far away are added, to
+check that the wall grid keeps the time per step from growing."""
+
+import argparse
+import random
+import sys
+import time
+
+from agentWallGrid import Rob_env_indexed, Rob_body_indexed
+
+box = {((-15,-15),(15,-15)), ((15,-15),(15,15)),
+       ((15,15),(-15,15)), ((-15,15),(-15,-15))}
+
+def far_walls(num_walls, seed=2, size=5000, length=15):
+    """returns a set of num_walls random walls starting more than 100 away
+    from both axes, so they are nowhere near the box"""
+    rand = random.Random(seed)
+    walls = set()
+    while len(walls) < num_walls:
+        x, y = rand.uniform(-size, size), rand.uniform(-size, size)
+        if min(abs(x), abs(y)) > 100:
+            walls.add(((x, y), (x+rand.uniform(-length, length), y+rand.uniform(-length, length))))
+    return walls
+
+def step_time(num_far_walls, steps=300, repeats=5):
+    """returns the least time per step of a robot circling inside the box,
+    with num_far_walls more walls far away"""
+    walls = box | far_walls(num_far_walls)
+    best = float('inf')
+    for _ in range(repeats):
+        body = Rob_body_indexed(Rob_env_indexed(walls), (0,0,90))
+        body.plotting = False
+        start = time.perf_counter()
+        for _ in range(steps):
+            body.do({'steer':'left'})
+        best = min(best, (time.perf_counter()-start)/steps)
+        assert not body.crashed
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time robot steps as far walls are added.")
+    parser.add_argument('--walls', default="0,1000,20000",
+                        help="comma-separated numbers of far walls")
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="times each case is run; the least time is recorded")
+    args = parser.parse_args(argv)
+    base = None
+    for n in [int(n) for n in args.walls.split(',')]:
+        t = step_time(n, args.steps, args.repeats)
+        base = base or t
+        print(f"{n:>7} far walls: {t*1e6:8.1f} us per step ({t/base:.2f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# example:
+# python agentBenchmark.py --walls 0,20000
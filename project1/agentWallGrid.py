@@ -0,0 +1,266 @@
+# agentWallGrid.py - Uniform grid index of wall segments
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""An index of wall segments on a uniform grid, and a robot environment
+and body that use it to test only the walls near a move."""
+
+import math
+import matplotlib.pyplot as plt
+from agentEnv import Rob_env, Rob_body, line_segments_intersect
+
+class Wall_grid(object):
+    """An index of wall segments on a uniform grid of square cells of side
+    cell_size: cells maps (i,j) to the list of the indexes (in walls) of the
+    walls that pass through the cell covering
+    [i*cell_size,(i+1)*cell_size] x [j*cell_size,(j+1)*cell_size].
+    A wall is added to the cells it passes through, found by walking along
+    it one cell at a time (a DDA traversal), so add() only touches those
+    cells and the index never needs rebuilding.
+    A query only tests the walls in the cells near the query segment, so
+    for short segments it takes time independent of the number of walls.
+    remove() takes a wall out of its cells and leaves None in walls, so
+    the indexes of the other walls do not change.
+    """
+    eps = 1e-9      # queries also look in cells this close, against rounding
+
+    def __init__(self, walls=(), cell_size=10):
+        self.cell_size = cell_size
+        self.walls = []
+        self.cells = {}
+        self.indexes = {}       # wall -> list of its indexes in walls
+        self.num_removed = 0
+        for wall in walls:
+            self.add(wall)
+
+    def cell(self, x, y):
+        """returns the (i,j) of the cell containing (x,y)"""
+        return (math.floor(x/self.cell_size), math.floor(y/self.cell_size))
+
+    def cells_on(self, segment):
+        """returns the list of the cells segment passes through, in order.
+        Where it goes through a corner, the two cells beside the corner are
+        included too."""
+        ((x0,y0),(x1,y1)) = segment
+        s = self.cell_size
+        (i,j), (i_end,j_end) = self.cell(x0,y0), self.cell(x1,y1)
+        dx, dy = x1-x0, y1-y0
+        step_i, step_j = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        # t (from 0 at (x0,y0) to 1 at (x1,y1)) of the next cell boundaries
+        t_x = ((i+(dx > 0))*s-x0)/dx if dx else math.inf
+        t_y = ((j+(dy > 0))*s-y0)/dy if dy else math.inf
+        dt_x = s/abs(dx) if dx else math.inf
+        dt_y = s/abs(dy) if dy else math.inf
+        cells = [(i,j)]
+        while (i,j) != (i_end,j_end):
+            if j == j_end or (i != i_end and t_x < t_y):
+                i += step_i
+                t_x += dt_x
+            elif i == i_end or t_y < t_x:
+                j += step_j
+                t_y += dt_y
+            else:   # through a corner
+                cells += [(i+step_i,j), (i,j+step_j)]
+                i, j = i+step_i, j+step_j
+                t_x, t_y = t_x+dt_x, t_y+dt_y
+            cells.append((i,j))
+        return cells
+
+    def add(self, wall):
+        """adds wall, a ((x0,y0),(x1,y1)) segment, to the index"""
+        k = len(self.walls)
+        self.walls.append(wall)
+        self.indexes.setdefault(wall, []).append(k)
+        for cell in set(self.cells_on(wall)):
+            self.cells.setdefault(cell, []).append(k)
+
+    def remove(self, wall):
+        """removes (one copy of) wall from the index"""
+        k = self.indexes[wall].pop()
+        if not self.indexes[wall]:
+            del self.indexes[wall]
+        self.walls[k] = None
+        self.num_removed += 1
+        for cell in set(self.cells_on(wall)):
+            self.cells[cell].remove(k)
+
+    def cells_in(self, x0, y0, x1, y1):
+        """returns the list of the cells overlapping the box from (x0,y0) to
+        (x1,y1), where x0<=x1 and y0<=y1, widened by eps"""
+        (i0,j0) = self.cell(x0-self.eps, y0-self.eps)
+        (i1,j1) = self.cell(x1+self.eps, y1+self.eps)
+        return [(i,j) for i in range(i0, i1+1) for j in range(j0, j1+1)]
+
+    def candidates(self, segment):
+        """returns the set of the indexes of the walls that might intersect
+        segment: those in the cells overlapping its bounding box, widened by
+        eps, or for long segments, in the cells along it and their neighbors"""
+        ((x0,y0),(x1,y1)) = segment
+        cells = self.cells_in(min(x0,x1), min(y0,y1), max(x0,x1), max(y0,y1))
+        if len(cells) > 16:
+            cells = {(i+di,j+dj) for (i,j) in self.cells_on(segment)
+                     for di in (-1,0,1) for dj in (-1,0,1)}
+        return {k for cell in cells for k in self.cells.get(cell, ())}
+
+    def intersects(self, segment):
+        """is True if segment intersects a wall"""
+        return any(line_segments_intersect(segment, self.walls[k])
+                   for k in self.candidates(segment))
+
+    def __len__(self):
+        return len(self.walls) - self.num_removed
+
+class Wall_set(set):
+    """A set of walls that keeps grid, a Wall_grid, up to date as walls are
+    added to it or removed from it, so the grid never needs checking
+    against the set.
+    """
+    def __init__(self, walls=(), grid=None):
+        set.__init__(self)
+        self.grid = grid if grid is not None else Wall_grid()
+        self.update(walls)
+
+    def add(self, wall):
+        if wall not in self:
+            set.add(self, wall)
+            self.grid.add(wall)
+
+    def discard(self, wall):
+        if wall in self:
+            set.discard(self, wall)
+            self.grid.remove(wall)
+
+    def remove(self, wall):
+        if wall not in self:
+            raise KeyError(wall)
+        self.discard(wall)
+
+    def pop(self):
+        if not self:
+            raise KeyError('pop from an empty set')
+        wall = next(set.__iter__(self))
+        self.discard(wall)
+        return wall
+
+    def clear(self):
+        set.clear(self)
+        self.grid = Wall_grid((), self.grid.cell_size)
+
+    def update(self, *others):
+        for other in others:
+            for wall in other:
+                self.add(wall)
+
+    def difference_update(self, *others):
+        for other in others:
+            for wall in other:
+                self.discard(wall)
+
+    def intersection_update(self, *others):
+        self.difference_update(set(self).difference(set(self).intersection(*others)))
+
+    def symmetric_difference_update(self, other):
+        for wall in set(other):
+            if wall in self:
+                self.discard(wall)
+            else:
+                self.add(wall)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+class Rob_env_indexed(Rob_env):
+    """A Rob_env whose walls are a Wall_set, so they are also kept in a
+    Wall_grid, wall_grid. Walls can be added with add_wall() or added to
+    and removed from the walls set directly; each change updates the grid
+    at once. Assigning a new collection to walls makes a new Wall_set.
+    """
+    def __init__(self, walls={}, cell_size=10):
+        self.cell_size = cell_size
+        Rob_env.__init__(self, walls)
+
+    @property
+    def walls(self):
+        """the Wall_set of the walls"""
+        return self.wall_set
+
+    @walls.setter
+    def walls(self, walls):
+        self.wall_set = Wall_set(walls, Wall_grid((), self.cell_size))
+
+    @property
+    def wall_grid(self):
+        """the Wall_grid of the walls"""
+        return self.wall_set.grid
+
+    def add_wall(self, wall):
+        """adds wall, a ((x0,y0),(x1,y1)) segment"""
+        self.wall_set.add(wall)
+
+    def hits_wall(self, segment):
+        """is True if segment intersects a wall"""
+        return self.wall_grid.intersects(segment)
+
+class Rob_body_indexed(Rob_body):
+    """A Rob_body in a Rob_env_indexed. do and whisker are those of
+    Rob_body, except that they test moves and the whisker with
+    env.wall_grid, which only looks at the walls in the grid cells near
+    the segment, so a step takes time independent of the number of walls.
+    """
+    def do(self,action):
+        """ action is {'steer':direction}
+        direction is 'left', 'right' or 'straight'
+        """
+        if self.crashed:
+            return self.percepts()
+        direction = action['steer']
+        compass_deriv = {'left':1,'straight':0,'right':-1}[direction]*self.turning_angle
+        self.rob_dir = (self.rob_dir + compass_deriv +360)%360  # make in range [0,360)
+        rob_x_new = self.rob_x + math.cos(self.rob_dir*math.pi/180)
+        rob_y_new = self.rob_y + math.sin(self.rob_dir*math.pi/180)
+        path = ((self.rob_x,self.rob_y),(rob_x_new,rob_y_new))
+        if self.env.wall_grid.intersects(path):
+            self.crashed = True
+            if self.plotting:
+                plt.plot([self.rob_x],[self.rob_y],"r*",markersize=20.0)
+                plt.draw()
+        self.rob_x, self.rob_y = rob_x_new, rob_y_new
+        self.history.append((self.rob_x, self.rob_y))
+        if self.plotting and not self.crashed:
+            plt.plot([self.rob_x],[self.rob_y],"go")
+            plt.draw()
+            plt.pause(self.sleep_time)
+        return self.percepts()
+
+    def whisker(self):
+        """returns true whenever the whisker sensor intersects with a wall
+        """
+        whisk_ang_world = (self.rob_dir-self.whisker_angle)*math.pi/180
+            # angle in radians in world coordinates
+        wx = self.rob_x + self.whisker_length * math.cos(whisk_ang_world)
+        wy = self.rob_y + self.whisker_length * math.sin(whisk_ang_world)
+        whisker_line = ((self.rob_x,self.rob_y),(wx,wy))
+        hit = self.env.wall_grid.intersects(whisker_line)
+        if hit:
+            self.wall_history.append((self.rob_x, self.rob_y))
+            if self.plotting:
+                plt.plot([wx],[wy],"ro")
+                plt.draw()
+        return hit
+
+# example:
+# env = Rob_env_indexed({((20,0),(30,20)), ((70,-5),(70,25))})
+# body = Rob_body_indexed(env)
+# env.add_wall(((40,40),(60,45)))
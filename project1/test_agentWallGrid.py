@@ -0,0 +1,84 @@
+# test_agentWallGrid.py - Tests of the wall grid index
+
+import random
+import pytest
+
+pytest.importorskip("agentEnv")
+from agentEnv import Rob_env, Rob_body, line_segments_intersect
+from agentWallGrid import Wall_grid, Rob_env_indexed, Rob_body_indexed
+from agentBenchmark import box, far_walls
+
+def random_wall(rand, size=40, length=15):
+    x, y = rand.uniform(-size, size), rand.uniform(-size, size)
+    return ((x, y), (x+rand.uniform(-length, length), y+rand.uniform(-length, length)))
+
+def quiet_body(body_class, env, init_pos=(0,0,90)):
+    """a body that does not plot (and pause) at each step"""
+    body = body_class(env, init_pos)
+    body.plotting = False
+    return body
+
+def test_grid_matches_all_walls():
+    rand = random.Random(0)
+    walls = [random_wall(rand) for _ in range(60)]
+    grid = Wall_grid(walls, cell_size=7)
+    for wall in walls[:20]:
+        grid.remove(wall)
+    walls = walls[20:]
+    assert len(grid) == len(walls)
+    for _ in range(2000):
+        segment = random_wall(rand, length=rand.choice([1, 6, 50]))
+        assert grid.intersects(segment) == any(line_segments_intersect(segment, wall)
+                                               for wall in walls)
+
+def test_changes_to_walls_update_the_grid():
+    env = Rob_env_indexed({((0,5),(10,5))})
+    assert env.hits_wall(((5,0),(5,6)))
+    env.walls.discard(((0,5),(10,5)))       # swapped for a wall of the same number
+    env.walls.add(((0,-5),(10,-5)))
+    assert not env.hits_wall(((5,0),(5,6)))
+    assert env.hits_wall(((5,0),(5,-6)))
+    env.walls |= {((0,5),(10,5))}
+    assert env.hits_wall(((5,0),(5,6)))
+    env.walls.clear()
+    assert not env.hits_wall(((5,0),(5,-6)))
+    env.walls = {((0,5),(10,5))}
+    assert env.hits_wall(((5,0),(5,6)))
+
+def test_walls_stay_a_plain_set_during_steps():
+    walls = {((0,5),(10,5)), ((200,200),(210,200))}
+    env = Rob_env_indexed(walls)
+    body = quiet_body(Rob_body_indexed, env)
+    body.do({'steer':'straight'})
+    assert set(env.walls) == walls and len(env.walls) == 2
+    assert ((200,200),(210,200)) in env.walls
+
+def test_body_moves_as_rob_body():
+    rand = random.Random(1)
+    walls = {random_wall(rand) for _ in range(200)}
+    for start in [(0,0,90), (-20,10,0), (15,-15,234)]:
+        bodies = [quiet_body(Rob_body, Rob_env(walls), start),
+                  quiet_body(Rob_body_indexed, Rob_env_indexed(walls), start)]
+        for i in range(300):
+            action = {'steer': ['left', 'straight', 'right'][i*7 % 3]}
+            percepts = [body.do(action) for body in bodies]
+            assert percepts[0] == percepts[1]
+
+def test_walls_examined_do_not_grow_with_walls():
+    """a robot circling inside the box only tests the box walls, however
+    many walls there are far away"""
+    env = Rob_env_indexed(box | far_walls(20000))
+    body = quiet_body(Rob_body_indexed, env)
+    grid = env.wall_grid
+    examined = []
+    def candidates(segment):
+        found = Wall_grid.candidates(grid, segment)
+        examined.append(found)
+        return found
+    grid.candidates = candidates
+    for _ in range(300):
+        body.do({'steer':'left'})
+    assert not body.crashed
+    assert len(examined) == 600     # a move and a whisker per step
+    assert any(examined)            # the box walls are tested near them
+    assert all(grid.walls[k] in box for found in examined for k in found)
@@ -0,0 +1,76 @@
+# mazeDistances.py - Exact all-pairs maze distances
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""The distance between every pair of cells of a maze, computed once by
+breadth-first search and cached on disk by layout."""
+
+import os
+import numpy as np
+from mazeGraph import MazeGraph
+
+default_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'mazeCache')
+
+class DistanceOracle(object):
+    """Number of moves between any two open cells of a maze.
+    matrix[i,j] is the maze distance from graph.cells[i] to graph.cells[j]
+    (unreachable is the largest value of the dtype). It is computed with one
+    breadth-first search per cell, and saved in cache_dir under the layout
+    hash of the maze, so later runs memory-map the file instead.
+    cache_dir=None turns the disk cache off.
+    """
+    def __init__(self, graph, cache_dir=default_cache_dir):
+        self.graph = graph
+        self.index = graph.index
+        filename = None
+        if cache_dir is not None:
+            filename = os.path.join(cache_dir, graph.layout_hash+".npy")
+        if filename and os.path.exists(filename):
+            self.matrix = np.load(filename, mmap_mode='r')
+        else:
+            self.matrix = self.compute()
+            if filename:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmpname = filename+"."+str(os.getpid())+".tmp"
+                with open(tmpname, 'wb') as f:
+                    np.save(f, self.matrix)
+                os.replace(tmpname, filename)   # atomic, for concurrent runs
+
+    def compute(self):
+        """returns the matrix of maze distances, one BFS per cell"""
+        moves = self.graph.moves
+        n = len(moves)
+        dtype = np.uint16 if n < np.iinfo(np.uint16).max else np.uint32
+        matrix = np.full((n, n), np.iinfo(dtype).max, dtype=dtype)
+        for source in range(n):
+            dist = [-1]*n
+            dist[source] = 0
+            layer = [source]
+            d = 0
+            while layer:
+                d += 1
+                next_layer = []
+                for i in layer:
+                    for j in moves[i]:
+                        if dist[j] < 0:
+                            dist[j] = d
+                            next_layer.append(j)
+                layer = next_layer
+            row = np.array(dist)
+            matrix[source, row >= 0] = row[row >= 0]
+        return matrix
+
+    def distance(self, a, b):
+        """maze distance between cells a and b.
+        Falls back to the Manhattan distance for cells not in the maze."""
+        if a in self.index and b in self.index:
+            return int(self.matrix[self.index[a], self.index[b]])
+        return abs(a[0]-b[0])+abs(a[1]-b[1])
+
+def distance_oracle(maze, cache_dir=default_cache_dir):
+    """returns the DistanceOracle of maze"""
+    return DistanceOracle(MazeGraph(maze), cache_dir)
+
+# example queries:
+# oracle = distance_oracle(maze)
+# problem = Search_problem(maze, lambda n:1, 'foodHeuristic', oracle=oracle)
@@ -0,0 +1,112 @@
+# mazeGraph.py - The graph of open cells of a Pacman maze
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""The move table of a maze's reachable cells, shared by the maze
+heuristics, oracles and query services."""
+
+import copy
+import hashlib
+import weakref
+
+class Walls(set):
+    """A set of walls that counts its changes in version, so a MazeGraph can
+    tell in constant time whether the walls have changed since it was made.
+    """
+    def __init__(self, walls=()):
+        set.__init__(self, walls)
+        self.version = 0
+
+def counting(method):
+    """returns method of set, incrementing the version of the set after it"""
+    def changed(self, *args):
+        result = method(self, *args)
+        self.version += 1
+        return result
+    changed.__name__ = method.__name__
+    changed.__doc__ = method.__doc__
+    return changed
+
+for name in ['add', 'discard', 'remove', 'pop', 'clear', 'update',
+             'difference_update', 'intersection_update',
+             'symmetric_difference_update',
+             '__ior__', '__isub__', '__iand__', '__ixor__']:
+    setattr(Walls, name, counting(getattr(set, name)))
+
+class MazeGraph(object):
+    """The open cells of a maze and the moves between them.
+    The cells are found by flood fill from pacman's position using
+    maze.legalMoves and maze.makeMove, so only reachable cells are included.
+    * cells is the sorted list of (x,y) cells
+    * index maps each cell to its position in cells
+    * moves[i] is the list of indexes of the cells one move away from cells[i]
+    * layout_hash identifies the layout (the cells and moves), and changes
+      whenever the walls change.
+    * walls and walls_version are the maze's walls and what maze_graph
+      needs to tell whether they have changed (see walls_state).
+    """
+    def __init__(self, maze):
+        self.maze = maze
+        start = tuple(maze.state[0])
+        seen = {start}
+        to_do = [start]
+        adjacent = {}
+        while to_do:
+            pos = to_do.pop()
+            adjacent[pos] = [tuple(maze.makeMove(pos, d)) for d in maze.legalMoves(pos)]
+            for neigh in adjacent[pos]:
+                if neigh not in seen:
+                    seen.add(neigh)
+                    to_do.append(neigh)
+        self.cells = sorted(seen)
+        self.index = {cell:i for (i,cell) in enumerate(self.cells)}
+        self.moves = [sorted(self.index[n] for n in adjacent[cell])
+                      for cell in self.cells]
+        self.layout_hash = hashlib.sha1(
+            repr((self.cells, self.moves)).encode()).hexdigest()
+        (self.walls, self.walls_version) = walls_state(maze)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def is_open(self, cell):
+        """is True if cell is a reachable open cell"""
+        return cell in self.index
+
+    def neighbor_cells(self, cell):
+        """returns the cells one move away from cell"""
+        return [self.cells[j] for j in self.moves[self.index[cell]]]
+
+graphs = weakref.WeakKeyDictionary()    # maze -> its MazeGraph
+
+def walls_state(maze):
+    """returns (walls, version) for the walls of maze. A set of walls is
+    replaced by a Walls set, whose version counts its changes; for other
+    collections of walls the version is a copy of them. maze_graph makes
+    a new graph when either differs."""
+    walls = getattr(maze, 'walls', None)
+    if isinstance(walls, set) and not isinstance(walls, Walls):
+        walls = maze.walls = Walls(walls)
+    if isinstance(walls, Walls):
+        return (walls, walls.version)
+    return (walls, copy.deepcopy(walls))
+
+def maze_graph(maze):
+    """returns the MazeGraph of maze, made once and kept while maze exists.
+    It is made again when the walls of maze have changed, or when pacman is
+    in a cell it does not include. When the walls are a set (which this
+    turns into a Walls set), telling whether they have changed takes
+    constant time; a copy of other walls is compared with them."""
+    graph = graphs.get(maze)
+    if graph is None or tuple(maze.state[0]) not in graph.index:
+        graph = graphs[maze] = MazeGraph(maze)
+    else:
+        (walls, version) = walls_state(maze)
+        if walls is not graph.walls or version != graph.walls_version:
+            graph = graphs[maze] = MazeGraph(maze)
+    return graph
+
+def walls_changed(maze):
+    """forgets the MazeGraph of maze, so maze_graph makes a new graph, for
+    walls it cannot tell have changed (such as a set changed through a
+    reference kept from before maze_graph replaced it)"""
+    graphs.pop(maze, None)
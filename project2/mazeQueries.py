@@ -0,0 +1,177 @@
+# mazeQueries.py - Answering many path queries on one maze
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Answers many (start, goal) path queries on one maze, sharing the
+shortest-path tree of each start between its queries."""
+
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from mazeGraph import MazeGraph, maze_graph
+from searchProblem import Path, PacmanState, LRUCache
+
+class MazeQueries(object):
+    """Shortest paths between cells of one maze, sharing the work between
+    queries:
+    * graph is the mazeGraph.MazeGraph of the maze (its move table)
+    * the shortest-path tree from each start cell is computed once by
+      breadth-first search and kept in an LRU cache of tree_cache_size trees,
+      so all the queries from one start share it
+    * if oracle (a DistanceOracle of the same maze) is given, no trees are
+      needed: paths follow decreasing distances in the distance matrix.
+    path(start, goal) answers one query; paths(queries) answers a list of
+    (start, goal) queries, grouped by start so each tree is used while it
+    is cached, and returns the paths in the order of the queries.
+    When there are at least pool_threshold starts and workers (default: the
+    number of CPUs) is more than 1, the groups of queries are shared out
+    between a pool of that many processes. They are not threads because
+    the searches are pure Python, so threads would run one at a time under
+    the GIL. Each worker sends back the cell indexes of its paths. The trees
+    a worker computes stay in that worker; it starts with those cached when
+    the pool was made. For fewer starts, starting the processes costs more
+    than the searches, so they are answered in the calling process.
+    The nodes of a path are states of the one-food problem for goal, as for
+    findPathToNearestDot; a path is None if the goal can't be reached.
+    """
+    pool_threshold = 64
+
+    def __init__(self, maze, oracle=None, tree_cache_size=256, workers=None):
+        self.graph = maze if isinstance(maze, MazeGraph) else maze_graph(maze)
+        self.oracle = oracle
+        self.trees = LRUCache(tree_cache_size)
+        self.workers = workers
+
+    def tree(self, source):
+        """returns the shortest-path tree from cell index source: an array
+        of the parent index of each cell (-1 for source or if unreachable)"""
+        parents = self.trees.get(source)
+        if parents is not None:
+            return parents
+        moves = self.graph.moves
+        parents = array('i', [-1])*len(moves)
+        seen = {source}
+        layer = [source]
+        while layer:
+            next_layer = []
+            for i in layer:
+                for j in moves[i]:
+                    if j not in seen:
+                        seen.add(j)
+                        parents[j] = i
+                        next_layer.append(j)
+            layer = next_layer
+        self.trees.put(source, parents)
+        return parents
+
+    def cells_between(self, source, target):
+        """returns the list of cell indexes of a shortest path from source
+        to target, or None if there is none"""
+        if source == target:
+            return [source]
+        if self.oracle is not None:
+            matrix = self.oracle.matrix
+            if matrix[source, target] >= len(matrix):   # unreachable
+                return None
+            cells = [target]
+            while cells[-1] != source:  # step back to a cell one move closer
+                here = cells[-1]
+                cells.append(next(j for j in self.graph.moves[here]
+                                  if matrix[source, j] == matrix[source, here]-1))
+        else:
+            parents = self.tree(source)
+            if parents[target] < 0:
+                return None
+            cells = [target]
+            while cells[-1] != source:
+                cells.append(parents[cells[-1]])
+        cells.reverse()
+        return cells
+
+    def query_cells(self, start, goal):
+        """returns the list of cell indexes of a shortest path from cell
+        start to cell goal, or None if there is none"""
+        index = self.graph.index
+        if tuple(start) not in index or tuple(goal) not in index:
+            return None
+        return self.cells_between(index[tuple(start)], index[tuple(goal)])
+
+    def make_path(self, cells):
+        """returns the Path through the list of cell indexes cells, or None
+        if cells is None"""
+        if cells is None:
+            return None
+        graph_cells = self.graph.cells
+        target = cells[-1]
+        food = (graph_cells[target],)
+        path = Path(PacmanState(graph_cells[cells[0]], int(cells[0] != target), 0, food, ()))
+        for i in cells[1:]:
+            path = Path(path, [PacmanState(graph_cells[i], int(i != target), 0, food, ()), 1])
+        return path
+
+    def path(self, start, goal):
+        """returns a shortest Path from cell start to cell goal, or None"""
+        return self.make_path(self.query_cells(start, goal))
+
+    def paths(self, queries):
+        """returns the list of paths for the list of (start, goal) queries,
+        in the same order"""
+        queries = [(tuple(start), tuple(goal)) for (start, goal) in queries]
+        by_start = {}
+        for (i, (start, goal)) in enumerate(queries):
+            by_start.setdefault(start, []).append((i, goal))
+        groups = list(by_start.items())
+        workers = self.workers or os.cpu_count() or 1
+        if workers > 1 and len(groups) >= self.pool_threshold:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            with ProcessPoolExecutor(workers, mp_context=context,
+                                     initializer=pool_init, initargs=(self,)) as pool:
+                answers = pool.map(pool_cells, [groups[w::workers]
+                                                for w in range(workers)])
+                cells = [answer for chunk in answers for answer in chunk]
+        else:
+            cells = answer_groups(self, groups)
+        results = [None]*len(queries)
+        for (i, path_cells) in cells:
+            results[i] = self.make_path(path_cells)
+        return results
+
+def answer_groups(service, groups):
+    """returns the list of (query number, cells of its path) for groups, a
+    list of (start, [(query number, goal)...]) groups of queries"""
+    return [(i, service.query_cells(start, goal))
+            for (start, queries) in groups for (i, goal) in queries]
+
+pool_service = None     # the MazeQueries of a pool worker
+
+def pool_init(service):
+    """sets the MazeQueries that this pool worker answers queries for"""
+    global pool_service
+    pool_service = service
+
+def pool_cells(groups):
+    """answer_groups for the MazeQueries of this pool worker"""
+    return answer_groups(pool_service, groups)
+
+query_services = LRUCache(16)   # layout_hash -> MazeQueries
+
+def maze_queries(maze, oracle=None, tree_cache_size=256, workers=None):
+    """returns the MazeQueries for maze, reusing the one made for an earlier
+    maze with the same layout (and tree_cache_size and workers) so its
+    trees are not recomputed. If oracle is given and is not the oracle of
+    that service, a new service using oracle replaces it.
+    A change to the walls of maze changes its layout, so the next call
+    gives a service for the new layout; a service got before the change
+    still answers for the old one."""
+    graph = maze_graph(maze)
+    service = query_services.get(graph.layout_hash)
+    if (service is None or (oracle is not None and oracle is not service.oracle)
+            or service.trees.maxsize != tree_cache_size or service.workers != workers):
+        service = MazeQueries(graph, oracle, tree_cache_size, workers)
+        query_services.put(graph.layout_hash, service)
+    return service
+
+# example queries:
+# queries = maze_queries(maze)
+# queries.paths([((1,1),(5,3)), ((1,1),(7,2)), ((4,4),(1,1))])
@@ -0,0 +1,70 @@
+# pathCache.py - Caching the paths found in a maze
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""A cache of path search results, keyed by maze layout, start and goal,
+that can be saved to disk."""
+
+import os
+import pickle
+from mazeGraph import maze_graph
+from searchProblem import LRUCache
+
+class PathCache(object):
+    """Results of path searches, keyed by (layout_hash, start, goal), where
+    layout_hash is the MazeGraph.layout_hash of the maze. A change to the
+    walls changes the layout hash, so entries for the old layout are never
+    returned for the new one; invalidate() removes them.
+    At most maxsize results are kept; the least recently used is evicted.
+    If filename is given, the cache is loaded from it when it exists, and
+    save() writes it back (with pickle, so the results must be picklable).
+    """
+    def __init__(self, maxsize=1024, filename=None):
+        self.cache = LRUCache(maxsize)
+        self.filename = filename
+        if filename is not None and os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                for (key, value) in pickle.load(f):
+                    self.cache.put(key, value)
+
+    @staticmethod
+    def layout_hash(maze):
+        """returns the layout hash of maze, which changes when its walls do.
+        It is computed once per maze (see mazeGraph.maze_graph), and again
+        only when the walls have changed."""
+        return maze_graph(maze).layout_hash
+
+    def get(self, layout_hash, start, goal):
+        """returns the cached result for start and goal, or None"""
+        return self.cache.get((layout_hash, start, goal))
+
+    def put(self, layout_hash, start, goal, result):
+        """caches result for start and goal in the given layout"""
+        self.cache.put((layout_hash, start, goal), result)
+
+    def invalidate(self, layout_hash=None):
+        """removes the entries of layout_hash, or all entries if it is None"""
+        if layout_hash is None:
+            self.cache.data.clear()
+        else:
+            for key in [key for key in self.cache.data if key[0] == layout_hash]:
+                del self.cache.data[key]
+
+    def save(self, filename=None):
+        """writes the cache to filename (default: the one it was loaded from)"""
+        filename = filename or self.filename
+        tmpname = filename+"."+str(os.getpid())+".tmp"
+        with open(tmpname, 'wb') as f:
+            pickle.dump(list(self.cache.data.items()), f)
+        os.replace(tmpname, filename)   # atomic, for concurrent runs
+
+    def __len__(self):
+        return len(self.cache)
+
+    def stats(self):
+        """returns a dictionary of the cache counters"""
+        return self.cache.stats()
+
+# example queries:
+# cache = PathCache(filename="paths.pickle")
+# ClosestDotSearchAgent(problem, cache=cache)
+# cache.save()
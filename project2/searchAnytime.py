@@ -0,0 +1,150 @@
+# searchAnytime.py - Anytime weighted A* (ARA*)
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Anytime repairing A*: a first path found quickly with an inflated
+heuristic, then better paths as the inflation is reduced."""
+
+import heapq
+import time
+from display import Displayable
+from searchProblem import Path
+
+class AnytimeAStarSearcher(Displayable):
+    """Anytime repairing A* (ARA*).
+    It first searches with f = g + weight*h, which quickly finds a path that
+    costs at most weight times the optimal cost. It then lowers the weight
+    by weight_step, reusing the search done so far, down to weight 1.
+
+    solutions() is a generator of (path, weight, bound) triples, one for
+    each cheaper path found; bound is an upper bound on path.cost divided
+    by the optimal cost. It stops when the last path is proved optimal
+    (bound 1), when there are no more paths, or when deadline seconds have
+    passed since it started. The caller can stop taking solutions at any
+    time.
+    After solutions() has finished, best_path is the best path found and
+    suboptimality its bound (1 if it was proved optimal).
+    search() returns the best path found (and explored_nodes, not recorded).
+    """
+    def __init__(self, problem, weight=3.0, weight_step=0.5, deadline=None):
+        assert weight >= 1, "the weight must be at least 1"
+        assert weight_step > 0, "the weight step must be positive"
+        self.problem = problem
+        self.initial_weight = weight
+        self.weight_step = weight_step
+        self.deadline = deadline
+        self.num_expanded = 0
+        self.explored_nodes = []
+
+    def solutions(self):
+        """generates (path, weight, bound) for successively cheaper paths"""
+        inf = float("inf")
+        problem = self.problem
+        end_time = None if self.deadline is None else time.monotonic()+self.deadline
+        start = problem.start_node()
+        self.g = {start: 0}
+        self.parent = {start: None}     # node -> (previous node, arc)
+        self.weight = self.initial_weight
+        self.best_path = None
+        self.cost = inf                 # the cost of best_path
+        self.suboptimality = inf
+        self.open = {start}
+        self.incons = set()
+        self.closed = set()
+        self.counter = 0
+        self.heap = []
+        self.push(start)
+        while True:
+            improved = self.improve_path(end_time)
+            bound = self.suboptimality = self.bound()
+            if improved:
+                self.display(1, "Path of cost", self.cost, "with weight", self.weight,
+                             "after", self.num_expanded, "expansions; bound", bound)
+                yield self.best_path, self.weight, bound
+            if (bound <= 1 or self.weight <= 1 or not (self.open or self.incons)
+                    or (end_time is not None and time.monotonic() >= end_time)):
+                return
+            self.weight = max(1, self.weight-self.weight_step)
+            self.open |= self.incons
+            self.incons = set()
+            self.closed = set()
+            self.heap = []
+            for node in self.open:
+                self.push(node)
+
+    def key(self, node):
+        return self.g[node] + self.weight*self.problem.heuristic(node)
+
+    def push(self, node):
+        self.counter += 1
+        heapq.heappush(self.heap, (self.key(node), -self.counter, node))
+
+    def improve_path(self, end_time):
+        """expands nodes in key order while that can find a cheaper path.
+        Returns True if a cheaper path was found."""
+        improved = False
+        while self.heap:
+            if end_time is not None and time.monotonic() >= end_time:
+                break
+            (key, _, node) = self.heap[0]
+            if node not in self.open or key != self.key(node):
+                heapq.heappop(self.heap)        # stale entry
+                continue
+            if key >= self.cost:
+                break
+            heapq.heappop(self.heap)
+            self.open.discard(node)
+            self.closed.add(node)
+            if self.problem.is_goal(node):
+                if self.g[node] < self.cost:
+                    self.best_path = self.make_path(node)
+                    self.cost = self.best_path.cost
+                    improved = True
+                continue
+            self.num_expanded += 1
+            for arc in self.problem.neighbors(node):
+                neighbor = arc[0]
+                cost = self.g[node] + arc[1]
+                if cost < self.g.get(neighbor, float("inf")) and (
+                        cost + self.problem.heuristic(neighbor) < self.cost):
+                    self.g[neighbor] = cost
+                    self.parent[neighbor] = (node, arc)
+                    if neighbor in self.closed:
+                        self.incons.add(neighbor)
+                    else:
+                        self.open.add(neighbor)
+                        self.push(neighbor)
+        return improved
+
+    def bound(self):
+        """upper bound on cost/optimal cost of the best path found"""
+        if self.best_path is None:
+            return float("inf")
+        lower = min([self.g[n]+self.problem.heuristic(n) for n in self.open | self.incons]
+                    + [self.cost])
+        if lower > 0:
+            return min(self.weight, self.cost/lower)
+        return 1 if self.cost == 0 else self.weight     # a 0-cost path is optimal
+
+    def make_path(self, node):
+        """returns the Path to node following the parent pointers"""
+        arcs = []
+        while self.parent[node] is not None:
+            (node, arc) = self.parent[node]
+            arcs.append(arc)
+        path = Path(node)
+        for arc in reversed(arcs):
+            path = Path(path, arc)
+        return path
+
+    def search(self):
+        """returns the best path found before the search ended, and
+        explored_nodes"""
+        for _ in self.solutions():
+            pass
+        self.solution = self.best_path
+        return self.solution, self.explored_nodes
+
+# example queries:
+# searcher = AnytimeAStarSearcher(searchProblem.cyclic_delivery_problem, deadline=1)
+# for (path, weight, bound) in searcher.solutions():
+#     if bound < 1.2: break
@@ -0,0 +1,46 @@
+# searchAsync.py - Running searchers in an asyncio event loop
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Runs searchers a slice of steps at a time in an asyncio event loop,
+so many searches can be served concurrently."""
+
+import asyncio
+
+async def search_async(searcher, slice_size=100, deadline=None):
+    """runs searcher (a Searcher, or any searcher with search_steps()) and
+    returns what its search() would return.
+    It expands slice_size paths at a time, and lets the event loop run other
+    tasks between slices, so many searches can share one process.
+    deadline is in seconds; if the search has not finished by then,
+    TimeoutError is raised. Cancelling the task stops the search at the
+    end of the current slice.
+    """
+    loop = asyncio.get_running_loop()
+    end_time = None if deadline is None else loop.time()+deadline
+    steps = searcher.search_steps()
+    try:
+        while True:
+            for _ in range(slice_size):
+                next(steps)
+            if end_time is not None and loop.time() >= end_time:
+                raise TimeoutError("search not finished after "+str(deadline)+" seconds")
+            await asyncio.sleep(0)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+async def search_all(searchers, slice_size=100, deadline=None):
+    """runs the searchers concurrently, interleaving their slices, and returns
+    the list of their results in the same order; the result of a searcher
+    that runs past the deadline (in seconds, for each one) is None"""
+    async def one(searcher):
+        try:
+            return await search_async(searcher, slice_size, deadline)
+        except TimeoutError:
+            return None
+    return await asyncio.gather(*(one(searcher) for searcher in searchers))
+
+# example queries:
+# path, explored = asyncio.run(search_async(AStarSearcher(problem), deadline=2))
+# results = asyncio.run(search_all([AStarSearcher(p) for p in problems]))
@@ -0,0 +1,211 @@
+# searchBenchmark.py - Scaling benchmarks for the searchers
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Times the searchers on random mazes of growing size, and reports the
+cases that got slower or bigger than a saved baseline."""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from mazeGraph import Walls
+from searchProblem import Search_problem
+from searchGeneric import Searcher, BFSearcher, AStarSearcher, UniformCostSearcher
+from searchMPP import GraphAStarSearcher, GraphUniformCostSearcher
+
+moves = {'North':(0,1), 'South':(0,-1), 'East':(1,0), 'West':(-1,0)}
+
+class GridMaze(object):
+    """A Pacman-style maze with the interface the search problems use:
+    state = [pacman_pos, food, power], legalMoves(pos) and makeMove(pos, dir).
+    walls is the set of wall cells (a mazeGraph.Walls set, so the graphs
+    made from the maze can tell when it changes); the border is all walls.
+    """
+    def __init__(self, width, height, walls, pacman_pos, food, power=()):
+        self.width = width
+        self.height = height
+        self.walls = Walls(walls)
+        self.pacman_pos = pacman_pos
+        self.food = list(food)
+        self.power = list(power)
+        self.state = [pacman_pos, list(self.food), list(self.power)]
+
+    def legalMoves(self, pos):
+        """returns the directions pacman can move in from pos"""
+        return [d for (d,(dx,dy)) in moves.items()
+                if (pos[0]+dx, pos[1]+dy) not in self.walls]
+
+    def makeMove(self, pos, direction):
+        """returns the position after moving from pos in direction"""
+        (dx,dy) = moves[direction]
+        return (pos[0]+dx, pos[1]+dy)
+
+    def __str__(self):
+        food = set(self.food)
+        return "\n".join("".join('%' if (x,y) in self.walls
+                                 else 'P' if (x,y) == self.pacman_pos
+                                 else '.' if (x,y) in food else ' '
+                                 for x in range(self.width))
+                         for y in reversed(range(self.height)))
+
+def generate_maze(width, height, wall_density=0.2, num_food=1, seed=0):
+    """returns a random GridMaze. Each inner cell is a wall with probability
+    wall_density; cells not reachable from pacman are walled in, and the
+    food is put on distinct reachable cells."""
+    rand = random.Random(seed)
+    walls = {(x,y) for x in range(width) for y in range(height)
+             if x in (0, width-1) or y in (0, height-1) or rand.random() < wall_density}
+    open_cells = [(x,y) for x in range(width) for y in range(height) if (x,y) not in walls]
+    pacman_pos = rand.choice(open_cells)
+    reached = {pacman_pos}
+    to_do = [pacman_pos]
+    while to_do:
+        (x,y) = to_do.pop()
+        for (dx,dy) in moves.values():
+            cell = (x+dx, y+dy)
+            if cell not in walls and cell not in reached:
+                reached.add(cell)
+                to_do.append(cell)
+    walls |= set(open_cells)-reached
+    food = rand.sample(sorted(reached-{pacman_pos}), min(num_food, len(reached)-1))
+    return GridMaze(width, height, walls, pacman_pos, food)
+
+searchers = {'DFS':Searcher, 'BFS':BFSearcher, 'A*':AStarSearcher,
+             'UCS':UniformCostSearcher, 'GraphA*':GraphAStarSearcher,
+             'GraphUCS':GraphUniformCostSearcher}
+informed = {'A*', 'GraphA*'}
+heuristics = [None, 'h1', 'h2', 'foodHeuristic']
+
+def run_one(maze, searcher_name, heuristic, measure_memory=True, repeats=5):
+    """runs one searcher on a fresh problem for maze and returns a dictionary
+    with the seconds taken (the least of repeats runs, as one timing of a
+    short search is mostly noise), paths expanded, path cost and peak memory
+    (bytes allocated during the search, None if not measured)"""
+    seconds = None
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):     # Search_problem prints
+            problem = Search_problem(maze, lambda n: 1, heuristic)
+        start_time = time.perf_counter()
+        searcher = searchers[searcher_name](problem)
+        searcher.max_display_level = 0      # no progress messages in the timing
+        path, _ = searcher.search()
+        run_seconds = time.perf_counter()-start_time
+        if seconds is None or run_seconds < seconds:
+            seconds = run_seconds
+    peak = None
+    if measure_memory:   # a second run, as tracemalloc slows the search down
+        with contextlib.redirect_stdout(io.StringIO()):
+            problem = Search_problem(maze, lambda n: 1, heuristic)
+        tracemalloc.start()
+        quiet = searchers[searcher_name](problem)
+        quiet.max_display_level = 0
+        quiet.search()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'seconds':seconds, 'expanded':searcher.num_expanded,
+            'cost':path.cost if path is not None and problem.is_goal(path.end()) else None,
+            'peak_bytes':peak}
+
+def run_suite(sizes, wall_density, food_counts, seeds, names=None, measure_memory=True,
+              repeats=5):
+    """returns the list of results of every searcher/heuristic combination
+    on every generated maze"""
+    results = []
+    for (width, height) in sizes:
+        for num_food in food_counts:
+            for seed in seeds:
+                maze = generate_maze(width, height, wall_density, num_food, seed)
+                for name in (names or searchers):
+                    for heuristic in (heuristics if name in informed else [None]):
+                        result = {'width':width, 'height':height,
+                                  'wall_density':wall_density, 'food':num_food,
+                                  'seed':seed, 'searcher':name, 'heuristic':heuristic}
+                        result.update(run_one(maze, name, heuristic, measure_memory, repeats))
+                        print(format_result(result))
+                        results.append(result)
+    return results
+
+def result_key(result):
+    """the fields that identify a benchmark case"""
+    return (result['width'], result['height'], result['wall_density'],
+            result['food'], result['seed'], result['searcher'], result['heuristic'])
+
+def format_result(result):
+    return ("{width}x{height} d={wall_density} food={food} seed={seed} "
+            "{searcher:8} h={heuristic!s:13} {seconds:9.4f}s "
+            "expanded={expanded} cost={cost} peak={peak_bytes}").format(**result)
+
+def regressions(results, baseline, tolerance=0.25, min_seconds=0.005):
+    """returns the list of (result, reason) for the results that are worse
+    than the baseline case with the same key: slower or using more memory by
+    more than the tolerance fraction, expanding more paths, or finding a
+    more expensive path. A case is only slower if it also takes more than
+    min_seconds longer, as smaller differences are timing noise."""
+    base = {result_key(b): b for b in baseline}
+    found = []
+    for result in results:
+        old = base.get(result_key(result))
+        if old is None:
+            continue
+        if (result['seconds'] > old['seconds']*(1+tolerance)
+                and result['seconds'] > old['seconds']+min_seconds):
+            found.append((result, "time {:.4f}s > {:.4f}s".format(result['seconds'], old['seconds'])))
+        if result['expanded'] > old['expanded']:
+            found.append((result, "expanded {} > {}".format(result['expanded'], old['expanded'])))
+        if (result['cost'] is None) != (old['cost'] is None) or (
+                result['cost'] is not None and result['cost'] > old['cost']):
+            found.append((result, "cost {} vs {}".format(result['cost'], old['cost'])))
+        if (result['peak_bytes'] is not None and old['peak_bytes'] is not None
+                and result['peak_bytes'] > old['peak_bytes']*(1+tolerance)):
+            found.append((result, "memory {} > {}".format(result['peak_bytes'], old['peak_bytes'])))
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the searchers on random mazes.")
+    parser.add_argument('--sizes', default="10x10,20x20,40x20",
+                        help="comma-separated WIDTHxHEIGHT maze sizes")
+    parser.add_argument('--wall-density', type=float, default=0.2)
+    parser.add_argument('--food', default="1,3", help="comma-separated food counts")
+    parser.add_argument('--seeds', default="0,1,2", help="comma-separated random seeds")
+    parser.add_argument('--searchers', default=None,
+                        help="comma-separated searchers, from "+", ".join(searchers))
+    parser.add_argument('--no-memory', action='store_true',
+                        help="do not measure peak memory")
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--baseline', default=None,
+                        help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed fractional increase in time and memory")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="time increases of at most this are never regressions")
+    parser.add_argument('--repeats', type=int, default=5,
+                        help="times each case is run; the least time is recorded")
+    args = parser.parse_args(argv)
+    sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes.split(',')]
+    results = run_suite(sizes, args.wall_density,
+                        [int(n) for n in args.food.split(',')],
+                        [int(n) for n in args.seeds.split(',')],
+                        args.searchers.split(',') if args.searchers else None,
+                        not args.no_memory, args.repeats)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance, args.min_seconds)
+        for (result, reason) in found:
+            print("REGRESSION:", format_result(result), "--", reason)
+        print(len(found), "regressions against", args.baseline)
+        return 1 if found else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# example:
+# python searchBenchmark.py --output baseline.json
+# python searchBenchmark.py --baseline baseline.json --output new.json
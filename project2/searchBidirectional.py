@@ -0,0 +1,210 @@
+# searchBidirectional.py - Bidirectional searchers
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Breadth-first and A* searches from the start and back from the goals
+at once, stopping when the two searches meet."""
+
+import heapq
+from collections import deque
+from display import Displayable
+from searchProblem import Path
+
+class BidirectionalBFSearcher(Displayable):
+    """Breadth-first search from the start and from the goals at the same
+    time, meeting in the middle. It finds a path with the fewest arcs.
+
+    It works on problems that provide predecessors(node), such as
+    Search_problem_from_explicit_graph, and on maze problems with a single
+    remaining food item, where it searches over pacman's positions (maze
+    moves are reversible) and rebuilds the states of the path at the end.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.num_expanded = 0
+        self.explored_nodes = []
+        if hasattr(problem, 'predecessors'):
+            self.forward = lambda n: [arc[0] for arc in problem.neighbors(n)]
+            self.backward = lambda n: [arc[0] for arc in problem.predecessors(n)]
+            self.start = problem.start_node()
+            self.goals = list(problem.goals)
+        else:
+            start = problem.start_node()
+            foods = start[1]
+            assert len(foods) <= 1, "bidirectional search needs a single goal"
+            maze = problem.maze
+            self.forward = self.backward = lambda pos: [
+                tuple(maze.makeMove(pos, d)) for d in maze.legalMoves(pos)]
+            self.start = start.pos
+            self.goals = [tuple(f) for f in foods] or [start.pos]
+
+    def search(self):
+        """returns a path from the problem's start node to a goal node
+        and the list of explored nodes.
+        The path is None if no path exists.
+        """
+        fparent = {self.start: None}    # node -> previous node from start
+        bparent = {g: None for g in self.goals}     # node -> next node to goal
+        ffront = deque([self.start])
+        bfront = deque(self.goals)
+        meet = next((g for g in self.goals if g in fparent), None)
+        while meet is None and ffront and bfront:
+            # expand a whole layer of the smaller frontier
+            if len(ffront) <= len(bfront):
+                meet = self.expand_layer(ffront, fparent, bparent, self.forward)
+            else:
+                meet = self.expand_layer(bfront, bparent, fparent, self.backward)
+        if meet is None:
+            self.display(1, "No path found.", self.num_expanded, "nodes expanded.")
+            return None, self.explored_nodes
+        nodes = []
+        node = meet
+        while node is not None:
+            nodes.append(node)
+            node = fparent[node]
+        nodes.reverse()
+        node = bparent[meet]
+        while node is not None:
+            nodes.append(node)
+            node = bparent[node]
+        self.display(1, self.num_expanded, "nodes expanded.")
+        self.solution = self.make_path(nodes)
+        return self.solution, self.explored_nodes
+
+    def expand_layer(self, front, parent, other, neighbors):
+        """expands every node of the current layer of front.
+        Returns the meeting node with fewest total arcs, or None."""
+        meet = None
+        best = None
+        for _ in range(len(front)):
+            node = front.popleft()
+            self.num_expanded += 1
+            for neigh in neighbors(node):
+                if neigh not in parent:
+                    parent[neigh] = node
+                    self.explored_nodes.append(neigh)
+                    front.append(neigh)
+                    if neigh in other:
+                        length = self.depth(neigh, parent) + self.depth(neigh, other)
+                        if best is None or length < best:
+                            meet, best = neigh, length
+        return meet
+
+    def depth(self, node, parent):
+        """number of arcs from node to the root of the parent tree"""
+        d = 0
+        while parent[node] is not None:
+            node = parent[node]
+            d += 1
+        return d
+
+    def make_path(self, nodes):
+        """turns the list of nodes from start to goal into a Path"""
+        if hasattr(self.problem, 'predecessors'):
+            path = Path(nodes[0])
+            for node in nodes[1:]:
+                arc = min((arc for arc in self.problem.neighbors(path.end())
+                           if arc[0] == node), key=lambda arc: arc[1])
+                path = Path(path, arc)
+        else:   # replay the positions to recover the states
+            path = Path(self.problem.start_node())
+            for pos in nodes[1:]:
+                arc = next(arc for arc in self.problem.neighbors(path.end())
+                           if arc[0].pos == pos)
+                path = Path(path, arc)
+        return path
+
+class BidirectionalAStarSearcher(Displayable):
+    """A* search forward from the start and backward from the goals at the
+    same time, for problems that provide predecessors(node), such as
+    Search_problem_from_explicit_graph. It finds a lowest-cost path.
+
+    The forward search uses the problem's heuristic h (from the hmap).
+    The backward search estimates the cost from the start to n by
+    max(0, h(start)-h(n)), which is admissible and consistent when h is.
+    mu is the cost of the best path found through a node reached from
+    both sides; the search stops when mu is at most the larger of the two
+    smallest f-values on the frontiers. Each step expands from the side
+    with the smaller frontier.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.num_expanded = 0
+        self.explored_nodes = []
+        self.start = problem.start_node()
+        self.goals = list(problem.goals)
+        self.h_start = problem.heuristic(self.start)
+
+    def heuristic(self, node, side):
+        """heuristic value of node for side 0 (forward) or 1 (backward)"""
+        h = self.problem.heuristic(node)
+        return h if side == 0 else max(0, self.h_start-h)
+
+    def search(self):
+        """returns a lowest-cost path from the problem's start node to a goal
+        node and the list of explored nodes.
+        The path is None if no path exists.
+        """
+        g = [{self.start: 0}, {goal: 0 for goal in self.goals}]
+        parent = [{self.start: None}, {goal: None for goal in self.goals}]
+        frontiers = [[(self.heuristic(self.start, 0), 0, 0, self.start)],
+                     [(self.heuristic(goal, 1), 0, i, goal)
+                      for (i, goal) in enumerate(self.goals)]]
+        heapq.heapify(frontiers[1])
+        self.counter = len(self.goals)
+        expand = [self.problem.neighbors, self.problem.predecessors]
+        self.mu, meet = (0, self.start) if self.start in g[1] else (float("inf"), None)
+        while True:
+            for side in (0, 1):     # drop entries for nodes reached more cheaply
+                frontier = frontiers[side]
+                while frontier and frontier[0][1] > g[side][frontier[0][3]]:
+                    heapq.heappop(frontier)
+            if not frontiers[0] or not frontiers[1]:
+                break
+            if self.mu <= max(frontiers[0][0][0], frontiers[1][0][0]):
+                break
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            (_, cost, _, node) = heapq.heappop(frontiers[side])
+            self.num_expanded += 1
+            for (neigh, arc_cost) in expand[side](node):
+                new_cost = cost + arc_cost
+                if new_cost < g[side].get(neigh, float("inf")):
+                    if neigh not in g[side]:
+                        self.explored_nodes.append(neigh)
+                    g[side][neigh] = new_cost
+                    parent[side][neigh] = (node, arc_cost)
+                    self.counter += 1
+                    heapq.heappush(frontiers[side],
+                        (new_cost+self.heuristic(neigh, side), new_cost, self.counter, neigh))
+                    if neigh in g[1-side] and new_cost+g[1-side][neigh] < self.mu:
+                        self.mu = new_cost+g[1-side][neigh]
+                        meet = neigh
+        if meet is None:
+            self.display(1, "No path found.", self.num_expanded, "nodes expanded.")
+            return None, self.explored_nodes
+        self.solution = self.make_path(meet, parent)
+        self.display(1, "Path of cost", self.solution.cost, "found;",
+                     self.num_expanded, "nodes expanded.")
+        return self.solution, self.explored_nodes
+
+    def make_path(self, meet, parent):
+        """returns the Path through meet given by the two parent maps"""
+        arcs = []
+        node = meet
+        while parent[0][node] is not None:
+            (prev, cost) = parent[0][node]
+            arcs.append([node, cost])
+            node = prev
+        path = Path(node)
+        for arc in reversed(arcs):
+            path = Path(path, arc)
+        node = meet
+        while parent[1][node] is not None:
+            (node, cost) = parent[1][node]
+            path = Path(path, [node, cost])
+        return path
+
+# example queries:
+# searcher1 = BidirectionalBFSearcher(searchProblem.cyclic_delivery_problem)
+# searcher1.search()  # path with fewest arcs
+# searcher2 = BidirectionalAStarSearcher(searchProblem.cyclic_delivery_problem)
+# searcher2.search()  # lowest-cost path
@@ -0,0 +1,187 @@
+# searchCSR.py - Explicit graphs compiled to compressed sparse rows
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Explicit graphs compiled to compressed sparse row arrays, which can be
+saved, memory-mapped and loaded from edge lists."""
+
+import os
+from array import array
+import numpy as np
+from searchProblem import Search_problem
+
+class Search_problem_from_CSR(Search_problem):
+    """An explicit graph search problem in compressed sparse row form.
+    * names is the list of node names; ids maps a name to its id
+    * the arcs out of node i go to targets[offsets[i]:offsets[i+1]]
+      with the costs in costs[offsets[i]:offsets[i+1]]
+    * start is the start node name and goals the set of goal names
+    * hvalues (optional) is the array of heuristic values by id.
+    The arrays can be NumPy arrays or memory-mapped arrays (see load_csr).
+    Nodes are given to the searchers by name, as in
+    Search_problem_from_explicit_graph, so any searcher can use either.
+    """
+    def __init__(self, names, offsets, targets, costs, start=None, goals=set(),
+                 hvalues=None):
+        self.names = list(names)
+        self.ids = {name:i for (i,name) in enumerate(self.names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.start = start
+        self.goals = goals
+        self.hvalues = hvalues
+        self.explicit = 1
+
+    def start_node(self):
+        """returns start node"""
+        return self.start
+
+    def is_goal(self,node):
+        """is True if node is a goal"""
+        return node in self.goals
+
+    def neighbors(self,node):
+        """returns the [to_node, cost] arcs out of node"""
+        i = self.ids[node]
+        begin, end = self.offsets[i], self.offsets[i+1]
+        names = self.names
+        return [[names[t], c] for (t,c) in zip(self.targets[begin:end].tolist(),
+                                              self.costs[begin:end].tolist())]
+
+    def successors(self,node):
+        """generates the [to_node, cost] arcs out of node, one at a time"""
+        i = self.ids[node]
+        names = self.names
+        targets, costs = self.targets, self.costs
+        for k in range(self.offsets[i], self.offsets[i+1]):
+            yield [names[targets[k]], costs[k].item()]
+
+    def neighbor_nodes(self,node):
+        """returns an iterator over the neighbors of node"""
+        i = self.ids[node]
+        return (self.names[t] for t in
+                self.targets[self.offsets[i]:self.offsets[i+1]].tolist())
+
+    def predecessors(self,node):
+        """returns the [from_node, cost] arcs into node.
+        The reverse graph is compiled on the first call."""
+        if not hasattr(self, 'reverse'):
+            sources = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+            self.reverse = csr_arrays(len(self.names), self.targets, sources, self.costs)
+        roffsets, rtargets, rcosts = self.reverse
+        if node not in self.ids:
+            return []
+        i = self.ids[node]
+        begin, end = roffsets[i], roffsets[i+1]
+        return [[self.names[s], c] for (s,c) in zip(rtargets[begin:end].tolist(),
+                                                    rcosts[begin:end].tolist())]
+
+    def heuristic(self,node):
+        """Gives the heuristic value of node n, 0 if there are no hvalues."""
+        if self.hvalues is None or node not in self.ids:
+            return 0
+        return self.hvalues[self.ids[node]].item()
+
+    def heuristic_batch(self, nodes):
+        """returns the list of the heuristic values of nodes"""
+        if self.hvalues is None:
+            return [0]*len(nodes)
+        return self.hvalues[[self.ids[n] for n in nodes]].tolist()
+
+    def __repr__(self):
+        """returns a string representation of the search problem"""
+        return ("Search_problem_from_CSR("+str(len(self.names))+" nodes, "
+                +str(len(self.targets))+" arcs)")
+
+def csr_arrays(num_nodes, sources, targets, costs):
+    """returns (offsets, targets, costs) of the arcs sources[k]->targets[k]
+    sorted by source; the arcs out of each node keep their order"""
+    sources = np.asarray(sources)
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(num_nodes+1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+    return offsets, np.asarray(targets)[order], np.asarray(costs)[order]
+
+def compile_graph(problem):
+    """returns the Search_problem_from_CSR for a
+    Search_problem_from_explicit_graph"""
+    names = sorted(problem.nodes, key=str)
+    ids = {name:i for (i,name) in enumerate(names)}
+    for goal in problem.goals:      # goals need not be in nodes
+        if goal not in ids:
+            ids[goal] = len(names)
+            names.append(goal)
+    sources = np.array([ids[arc.from_node] for arc in problem.arcs], dtype=np.int64)
+    targets = np.array([ids[arc.to_node] for arc in problem.arcs], dtype=np.int64)
+    costs = np.array([arc.cost for arc in problem.arcs])
+    offsets, targets, costs = csr_arrays(len(names), sources, targets, costs)
+    hvalues = np.array([problem.hmap.get(n, 0) for n in names]) if problem.hmap else None
+    return Search_problem_from_CSR(names, offsets, targets, costs,
+                                   problem.start, problem.goals, hvalues)
+
+def save_csr(graph, dirname):
+    """saves the arrays of graph (a Search_problem_from_CSR) in dirname"""
+    os.makedirs(dirname, exist_ok=True)
+    np.save(os.path.join(dirname, "names.npy"), np.array(graph.names, dtype=str))
+    for field in ('offsets', 'targets', 'costs'):
+        np.save(os.path.join(dirname, field+".npy"), np.asarray(getattr(graph, field)))
+    if graph.hvalues is not None:
+        np.save(os.path.join(dirname, "hvalues.npy"), np.asarray(graph.hvalues))
+
+def load_csr(dirname, start=None, goals=set(), mmap_mode='r'):
+    """returns the Search_problem_from_CSR saved in dirname by save_csr.
+    The offsets, targets, costs and hvalues are memory-mapped unless
+    mmap_mode is None."""
+    def load(field):
+        return np.load(os.path.join(dirname, field+".npy"), mmap_mode=mmap_mode)
+    hvalues = None
+    if os.path.exists(os.path.join(dirname, "hvalues.npy")):
+        hvalues = load("hvalues")
+    names = np.load(os.path.join(dirname, "names.npy")).tolist()
+    return Search_problem_from_CSR(names, load("offsets"), load("targets"),
+                                   load("costs"), start, goals, hvalues)
+
+def load_edge_list(filename, start=None, goals=set(), cache_dir=None):
+    """returns the Search_problem_from_CSR for an edge-list file.
+    Each line of the file is "from_node to_node [cost]" (cost defaults to 1);
+    blank lines and lines starting with # are ignored.
+    The compiled arrays are saved in cache_dir (by default filename+".csr")
+    and memory-mapped from there; the file is only parsed again when it is
+    newer than the cache.
+    """
+    if cache_dir is None:
+        cache_dir = filename+".csr"
+    stamp = os.path.join(cache_dir, "offsets.npy")
+    if not (os.path.exists(stamp)
+            and os.path.getmtime(stamp) >= os.path.getmtime(filename)):
+        ids = {}
+        sources, targets = array('q'), array('q')
+        costs = array('q')
+        with open(filename) as f:
+            for line in f:
+                fields = line.split()
+                if not fields or fields[0].startswith('#'):
+                    continue
+                cost = fields[2] if len(fields) > 2 else '1'
+                try:
+                    costs.append(int(cost))
+                except (ValueError, TypeError):
+                    if costs.typecode == 'q':
+                        costs = array('d', costs)
+                    costs.append(float(cost))
+                for (name, ends) in ((fields[0], sources), (fields[1], targets)):
+                    if name not in ids:
+                        ids[name] = len(ids)
+                    ends.append(ids[name])
+        names = list(ids)
+        offsets, csr_targets, csr_costs = csr_arrays(
+            len(names), np.frombuffer(sources, dtype=np.int64),
+            np.frombuffer(targets, dtype=np.int64), np.frombuffer(costs, dtype=costs.typecode))
+        save_csr(Search_problem_from_CSR(names, offsets, csr_targets, csr_costs), cache_dir)
+    return load_csr(cache_dir, start, goals)
+
+# example queries:
+# from searchGeneric import AStarSearcher
+# graph = compile_graph(searchProblem.cyclic_delivery_problem)
+# AStarSearcher(graph).search()
+# big = load_edge_list("roads.txt", start='a', goals={'z'})
@@ -10,31 +10,60 @@
 
 from display import Displayable, visualize
 import searchProblem
+from searchNodeStore import NodeStore, PathStore
+
+def run_steps(steps):
+    """runs the generator steps to the end and returns its return value"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
 
 class Searcher(Displayable):
     """returns a searcher for a problem.
     Paths can be found by repeatedly calling search().
     This does depth-first search unless overridden
+    The generated nodes are kept in a NodeStore; the frontier holds
+    StoredPath handles on them, and a Path is only built for the solution.
+    telemetry is an optional searchTelemetry.SearchTelemetry to fill in.
     """
-    def __init__(self, problem, quiet=False):
+    def __init__(self, problem, quiet=False, telemetry=None):
         """creates a searcher from a problem
         """
         self.quiet = quiet
         self.problem = problem
+        self.telemetry = telemetry
         self.initialize_frontier()
         self.num_expanded = 0
-        self.explored_nodes = []
-        self.add_to_frontier(Path(problem.start_node()))
+        self.initialize_store()
+        self.add_to_frontier(self.store.root(problem.start_node()))
         super().__init__()
 
     def initialize_frontier(self):
         self.frontier = []
+
+    def initialize_store(self):
+        self.store = NodeStore()
+
+    def initialize_explored(self):
+        self.explored = set()
         
     def empty_frontier(self):
         return self.frontier == []
         
     def add_to_frontier(self,path):
         self.frontier.append(path)
+
+    @property
+    def explored_nodes(self):
+        """the positions of the nodes generated, in the order generated"""
+        return self.store.explored_nodes()
+
+    def add_paths_to_frontier(self, paths):
+        """add the new paths to the successors of a node to the frontier"""
+        for path in paths:
+            self.add_to_frontier(path)
         
     @visualize
     def search(self):
@@ -42,9 +71,23 @@ class Searcher(Displayable):
         to a goal node. 
         Returns None if no path exists.
         """
-        self.explored={}
+        return run_steps(self.search_steps())
+
+    def search_steps(self):
+        """the search as a generator: it yields before each path is
+        expanded, and returns what search() returns. This lets a caller
+        (such as searchAsync) run the search a slice at a time.
+        """
+        self.initialize_explored()
+        tel = self.telemetry
         while not self.empty_frontier():
+            yield
+            if tel: tel.start()     # not counting time spent suspended
+            if tel: frontier_size = len(self.frontier)
             path = self.frontier.pop()
+            if tel:
+                tel.expanded(path.depth, frontier_size)
+                tel.lap('frontier')
             #if path.end() not in self.explored:
             # need to add checking if the path has already been explored
             # add the current state in the has table
@@ -53,36 +96,43 @@ class Searcher(Displayable):
             self.display(2, "Expanding:",path,"(cost:",path.cost,")")
             self.num_expanded += 1
             #print(self.problem.maze.state)
-            if self.problem.is_goal(path.end()):    # solution found
+            found = self.problem.is_goal(path.end())
+            if tel: tel.lap('goal_test')
+            if found:    # solution found
                 if not self.quiet:
                        self.display(1, self.num_expanded, "paths have been expanded and",
                                         len(self.frontier), "paths remain in the frontier")
-                self.solution = path   # store the solution found
-                return path, self.explored_nodes
+                self.solution = path.to_path()   # store the solution found
+                if tel: tel.finish(self.problem, self.solution)
+                return self.solution, self.explored_nodes
             else:
-                neighs = self.problem.neighbors(path.end())
-                self.display(3,"Neighbors are", neighs)
-                #print(neighs)
+                num_generated = 0
                 # you should not use arcs, but nodes only
-                for arc in neighs:
+                new_paths = []
+                for arc in self.problem.successors(path.end()):
+                    num_generated += 1
                     #print("path is \n\n", path)
                     #self.explored_nodes.append(arc[0][0])
-                    node=""
-                    node+=str(arc[0][0])
-                    node+=str(arc[0][1])
-                    node+=str(arc[0][2])
-                    #print("Node is \n\n",node)
+                    node = arc[0]   # states are hashable, so key on them directly
                     if node not in self.explored :
-                        self.explored_nodes.append(arc[0][0])
-                        self.add_to_frontier(Path(path,arc))
+                        new_paths.append(self.store.extend(path,arc))
                         #if not at food goals 
-                        self.explored[node]=""
+                        self.explored.add(node)
                     #self.explored_nodes.append(arc[1])
+                self.display(3,"New paths are", new_paths)
+                if tel:
+                    tel.generated(num_generated, len(new_paths))
+                    tel.lap('successors')
+                self.add_paths_to_frontier(new_paths)
+                if tel: tel.lap('frontier')
                 self.display(3,"Frontier:",self.frontier)
-        return path, self.explored_nodes
+        if tel: tel.finish(self.problem, None)
+        return path.to_path(), self.explored_nodes
         self.display(1,"No (more) solutions. Total of",
                      self.num_expanded,"paths expanded.")
 import queue
+from collections import deque, OrderedDict
+
 class FrontierQ(object):
     def __init__(self):
         """constructs the frontier, initially an empty queue 
@@ -100,6 +150,12 @@ class FrontierQ(object):
         self.frontier_index += 1    # get a new unique index
         queue.heappush(self.frontierq,(value, -self.frontier_index, path))
 
+    def add_all(self, paths, values):
+        """add each path with the corresponding value"""
+        for (path, value) in zip(paths, values):
+            self.frontier_index += 1
+            queue.heappush(self.frontierq,(value, -self.frontier_index, path))
+
     def pop(self):
         """returns and removes the path of the frontier with minimum value.
         """
@@ -121,6 +177,7 @@ class FrontierQ(object):
         return sum(1 for e in self.frontierq if e[0]==val)
 
 import heapq        # part of the Python standard library
+import operator
 from searchProblem import Path
 
 class FrontierPQ(object):
@@ -148,6 +205,12 @@ class FrontierPQ(object):
         self.frontier_index += 1    # get a new unique index
         heapq.heappush(self.frontierpq,(value, -self.frontier_index, path))
 
+    def add_all(self, paths, values):
+        """add each path with the corresponding value"""
+        for (path, value) in zip(paths, values):
+            self.frontier_index += 1
+            heapq.heappush(self.frontierpq,(value, -self.frontier_index, path))
+
     def pop(self):
         """returns and removes the path of the frontier with minimum value.
         """
@@ -171,67 +234,267 @@ class FrontierPQ(object):
         for (_,_,path) in self.frontierpq:
             yield path
 
+class FrontierBucket(object):
+    """A priority queue frontier for small non-negative integer values
+    (a bucket queue, or Dial's queue). buckets[v] is a stack of the
+    (index, path) pairs with value v, so among paths with equal values the
+    last one added is returned first, as for FrontierPQ. low is no larger
+    than the smallest value in the frontier; pop() moves it up past the
+    empty buckets, so with values that do not decrease, add and pop take
+    constant amortized time.
+    When a value is not an integer, is negative or is more than max_value,
+    the paths are moved to a heap of (value, -index, path) triples, which
+    is used from then on.
+    """
+    def __init__(self, max_value=1<<16):
+        self.max_value = max_value
+        self.frontier_index = 0  # the number of items ever added to the frontier
+        self.buckets = []
+        self.low = 0
+        self.size = 0
+        self.heap = None         # the heap, once the buckets are given up
+
+    def empty(self):
+        """is True if the frontier is empty"""
+        return self.size == 0
+
+    def add(self, path, value):
+        """add a path to the frontier
+        value is the value to be minimized"""
+        self.frontier_index += 1    # get a new unique index
+        self.size += 1
+        if self.heap is None:
+            bucket = value
+            if type(value) is not int:
+                try:
+                    bucket = operator.index(value)
+                except TypeError:
+                    bucket = -1     # not an integer
+            if 0 <= bucket <= self.max_value:
+                while len(self.buckets) <= bucket:
+                    self.buckets.append([])
+                self.buckets[bucket].append((self.frontier_index, path))
+                if bucket < self.low:
+                    self.low = bucket
+                return
+            self.use_heap()
+        heapq.heappush(self.heap, (value, -self.frontier_index, path))
+
+    def add_all(self, paths, values):
+        """add each path with the corresponding value"""
+        for (path, value) in zip(paths, values):
+            self.add(path, value)
+
+    def use_heap(self):
+        """moves the paths in the buckets to a heap"""
+        self.heap = [(value, -index, path) for (value, bucket) in enumerate(self.buckets)
+                     for (index, path) in bucket]
+        heapq.heapify(self.heap)
+        self.buckets = []
+
+    def pop(self):
+        """returns and removes the path of the frontier with minimum value.
+        """
+        self.size -= 1
+        if self.heap is not None:
+            return heapq.heappop(self.heap)[2]
+        while not self.buckets[self.low]:
+            self.low += 1
+        return self.buckets[self.low].pop()[1]
+
+    def entries(self):
+        """iterate through the (value, -index, path) entries in the frontier"""
+        if self.heap is not None:
+            yield from self.heap
+        for (value, bucket) in enumerate(self.buckets):
+            for (index, path) in bucket:
+                yield (value, -index, path)
+
+    def count(self,val):
+        """returns the number of elements of the frontier with value=val"""
+        return sum(1 for e in self.entries() if e[0]==val)
+
+    def __repr__(self):
+        """string representation of the frontier"""
+        return str([(n,c,str(p)) for (n,c,p) in self.entries()])
+
+    def __len__(self):
+        """length of the frontier"""
+        return self.size
+
+    def __iter__(self):
+        """iterate through the paths in the frontier"""
+        for (_,_,path) in self.entries():
+            yield path
+
+class FrontierBeam(object):
+    """A priority queue frontier that holds at most width paths. When a
+    path is added to a full frontier, the path with the largest value (the
+    oldest one among equal values) is dropped; num_pruned counts them.
+    It keeps a min-heap and a max-heap of the same (value, index, path)
+    entries. An entry removed from one heap is recorded in removed and
+    skipped when it reaches the top of the other; the heaps are rebuilt
+    when either holds more than twice width entries (pops only shrink the
+    min-heap), so memory stays proportional to width.
+    """
+    def __init__(self, width):
+        assert width > 0, "the beam width must be positive"
+        self.width = width
+        self.frontier_index = 0  # the number of items ever added to the frontier
+        self.minpq = []          # (value, -index, path)
+        self.maxpq = []          # (-value, index, path)
+        self.removed = set()     # indexes of entries removed from one heap only
+        self.size = 0
+        self.num_pruned = 0
+
+    def empty(self):
+        """is True if the frontier is empty"""
+        return self.size == 0
+
+    def add(self, path, value):
+        """add a path to the frontier, dropping the worst path if it is full
+        value is the value to be minimized"""
+        self.frontier_index += 1    # get a new unique index
+        heapq.heappush(self.minpq, (value, -self.frontier_index, path))
+        heapq.heappush(self.maxpq, (-value, self.frontier_index, path))
+        self.size += 1
+        if self.size > self.width:
+            self.drop_worst()
+        if len(self.minpq) > 2*self.width or len(self.maxpq) > 2*self.width:
+            self.compact()
+
+    def add_all(self, paths, values):
+        """add each path with the corresponding value"""
+        for (path, value) in zip(paths, values):
+            self.add(path, value)
+
+    def pop(self):
+        """returns and removes the path of the frontier with minimum value.
+        """
+        while True:
+            (_, neg_index, path) = heapq.heappop(self.minpq)
+            if -neg_index in self.removed:
+                self.removed.discard(-neg_index)
+            else:
+                break
+        self.removed.add(-neg_index)
+        self.size -= 1
+        return path
+
+    def drop_worst(self):
+        """removes the path with the largest value"""
+        while True:
+            (_, index, _) = heapq.heappop(self.maxpq)
+            if index in self.removed:
+                self.removed.discard(index)
+            else:
+                break
+        self.removed.add(index)
+        self.size -= 1
+        self.num_pruned += 1
+
+    def compact(self):
+        """rebuilds the heaps from the entries still in the frontier"""
+        self.minpq = [e for e in self.minpq if -e[1] not in self.removed]
+        self.maxpq = [(-value, -neg_index, path) for (value, neg_index, path) in self.minpq]
+        heapq.heapify(self.minpq)
+        heapq.heapify(self.maxpq)
+        self.removed = set()
+
+    def entries(self):
+        """iterate through the (value, -index, path) entries in the frontier"""
+        for e in self.minpq:
+            if -e[1] not in self.removed:
+                yield e
+
+    def count(self,val):
+        """returns the number of elements of the frontier with value=val"""
+        return sum(1 for e in self.entries() if e[0]==val)
+
+    def __repr__(self):
+        """string representation of the frontier"""
+        return str([(n,c,str(p)) for (n,c,p) in self.entries()])
+
+    def __len__(self):
+        """length of the frontier"""
+        return self.size
+
+    def __iter__(self):
+        """iterate through the paths in the frontier"""
+        for (_,_,path) in self.entries():
+            yield path
+
 class BFSearcher(Searcher):
     """ Returns Breadth First searcher for a problem
         Overload some files - the least number required
+        The frontier is a deque, so taking the oldest path is O(1).
     """
-    def __init__(self, problem, quiet=False):
+    def __init__(self, problem, quiet=False, telemetry=None):
         """creates a searcher from a problem
         """
         self.quiet = quiet
         self.problem = problem
+        self.telemetry = telemetry
         self.initialize_frontier()
         self.num_expanded = 0
-        self.explored_nodes = []
-        self.add_to_frontier(Path(problem.start_node()))
+        self.initialize_store()
+        self.add_to_frontier(self.store.root(problem.start_node()))
         
 
     def initialize_frontier(self):
-        self.frontier = []
+        self.frontier = deque()
         
     def empty_frontier(self):
-        return self.frontier == []
+        return not self.frontier
         
     def add_to_frontier(self,path):
         self.frontier.append(path)
       
-    def search(self):
-        """returns (next) path from the problem's start node
-        to a goal node. 
-        Returns None if no path exists.
-        """
-        self.explored={}
+    def search_steps(self):
+        """the search as a generator, as for Searcher.search_steps"""
+        self.initialize_explored()
+        tel = self.telemetry
         while not self.empty_frontier():
-            path = self.frontier.pop(0)
+            yield
+            if tel: tel.start()     # not counting time spent suspended
+            if tel: frontier_size = len(self.frontier)
+            path = self.frontier.popleft()
+            if tel:
+                tel.expanded(path.depth, frontier_size)
+                tel.lap('frontier')
             self.display(2, "Expanding:",path,"(cost:",path.cost,")")
             self.num_expanded += 1
             #print(self.problem.maze.state)
-            if self.problem.is_goal(path.end()):    # solution found
+            found = self.problem.is_goal(path.end())
+            if tel: tel.lap('goal_test')
+            if found:    # solution found
                 if not self.quiet:
                        self.display(1, self.num_expanded, "paths have been expanded and",
                                         len(self.frontier), "paths remain in the frontier")
-                self.solution = path   # store the solution found
-                return path, self.explored_nodes
+                self.solution = path.to_path()   # store the solution found
+                if tel: tel.finish(self.problem, self.solution)
+                return self.solution, self.explored_nodes
             else:
                 neighs = self.problem.neighbors(path.end())
                 self.display(3,"Neighbors are", neighs)
                 #print(neighs)
                 # you should not use arcs, but nodes only
+                num_added = 0
                 for arc in reversed(list(neighs)):
                     #print("path is \n\n", path)
-                    node=""
-                    node+=str(arc[0][0])
-                    node+=str(arc[0][1])
-                    node+=str(arc[0][2])
-                    #print("Node is \n\n",node)
+                    node = arc[0]   # states are hashable, so key on them directly
                     if node not in self.explored :
-                        self.explored_nodes.append(arc[0][0])
-                        self.add_to_frontier(Path(path,arc))
+                        self.add_to_frontier(self.store.extend(path,arc))
+                        num_added += 1
                         #if not at food goals 
-                        self.explored[node]=""
+                        self.explored.add(node)
                     #self.explored_nodes.append(arc[1])
+                if tel:
+                    tel.generated(len(neighs), num_added)
+                    tel.lap('successors')
                 self.display(3,"Frontier:",self.frontier)
-        return path, self.explored_nodes
+        if tel: tel.finish(self.problem, None)
+        return path.to_path(), self.explored_nodes
         self.display(1,"No (more) solutions. Total of",
                      self.num_expanded,"paths expanded.")
     
@@ -240,11 +503,11 @@ class AStarSearcher(Searcher):
     Paths can be found by repeatedly calling search().
     """
 
-    def __init__(self, problem):
-        super().__init__(problem)
+    def __init__(self, problem, telemetry=None):
+        super().__init__(problem, telemetry=telemetry)
 
     def initialize_frontier(self):
-        self.frontier = FrontierQ()
+        self.frontier = FrontierBucket()    # a heap if the values are not small integers
 
     def empty_frontier(self):
         return self.frontier.empty()
@@ -254,17 +517,78 @@ class AStarSearcher(Searcher):
         value = path.cost+self.problem.heuristic(path.end())
         self.frontier.add(path, value)
 
+    def add_paths_to_frontier(self, paths):
+        """add paths to the frontier, evaluating the heuristic on all
+        their end nodes in one call if the problem has heuristic_batch"""
+        if paths:
+            nodes = [path.end() for path in paths]
+            if hasattr(self.problem, 'heuristic_batch'):
+                hs = self.problem.heuristic_batch(nodes)
+            else:
+                hs = [self.problem.heuristic(node) for node in nodes]
+            self.frontier.add_all(paths, [path.cost+h for (path,h) in zip(paths,hs)])
+
+class RecentSet(object):
+    """A set of at most maxsize elements: adding to a full set forgets the
+    element that was added longest ago."""
+    def __init__(self, maxsize):
+        assert maxsize > 0, "the set size must be positive"
+        self.maxsize = maxsize
+        self.elements = OrderedDict()
+
+    def add(self, element):
+        self.elements[element] = None
+        self.elements.move_to_end(element)
+        if len(self.elements) > self.maxsize:
+            self.elements.popitem(last=False)
+
+    def __contains__(self, element):
+        return element in self.elements
+
+    def __len__(self):
+        return len(self.elements)
+
+class BeamSearcher(AStarSearcher):
+    """A* with a frontier of at most width paths (a FrontierBeam); the paths
+    with the largest f-values are dropped when it overflows. The path found
+    may not be optimal, and no path may be found even if one exists.
+    num_pruned is the number of paths dropped.
+    The memory used is bounded: the paths are LinkedPaths (from a
+    PathStore), so the nodes of a dropped path are freed unless a kept
+    path goes through them, and only the explored_size most recently
+    generated states (default 20*width) are remembered to avoid
+    regenerating them. So O(width * depth) nodes are kept. The explored
+    nodes are not recorded.
+    """
+    def __init__(self, problem, width=1000, explored_size=None, telemetry=None):
+        self.width = width
+        self.explored_size = explored_size or 20*width
+        super().__init__(problem, telemetry=telemetry)
+
+    def initialize_frontier(self):
+        self.frontier = FrontierBeam(self.width)
+
+    def initialize_store(self):
+        self.store = PathStore()
+
+    def initialize_explored(self):
+        self.explored = RecentSet(self.explored_size)
+
+    @property
+    def num_pruned(self):
+        return self.frontier.num_pruned
+
 class UniformCostSearcher(Searcher):
     """returns a searcher for a problem.
        Paths can be found by repeatedly calling search().
        Overload some files, the least number required. Look at AStarSearcher class.
        use a queue not priority queue
     """
-    def __init__(self, problem):
-        super().__init__(problem)
+    def __init__(self, problem, telemetry=None):
+        super().__init__(problem, telemetry=telemetry)
 
     def initialize_frontier(self):
-        self.frontier = FrontierPQ()
+        self.frontier = FrontierBucket()    # a heap if the values are not small integers
 
     def empty_frontier(self):
         return self.frontier.empty()
@@ -274,6 +598,10 @@ class UniformCostSearcher(Searcher):
         value = path.cost
         self.frontier.add(path, value)
 
+    def add_paths_to_frontier(self, paths):
+        """add paths to the frontier, valued by their cost"""
+        self.frontier.add_all(paths, [path.cost for path in paths])
+
 from searchProblem import *
 
 def FindClosestDot(pacman_pos, food):
@@ -0,0 +1,112 @@
+# searchJunction.py - Maze search over the junction graph
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Maze search over the junctions of a maze, with each corridor between
+two junctions compressed into one arc."""
+
+from mazeGraph import MazeGraph
+from searchProblem import Search_problem, Path
+
+class JunctionProblem(Search_problem):
+    """The search problem of a maze problem with its corridors collapsed.
+
+    The key cells are the junctions and dead ends (cells that do not have
+    exactly two open neighbors), the food and power cells, and pacman's
+    start. Every other cell is in a corridor between two key cells, and a
+    shortest path that enters a corridor goes straight through it. So each
+    corridor becomes one arc between its two key cells, costing the sum of
+    the costs of the cells it enters; only the cheapest arc between two key
+    cells is kept. Dead ends with nothing to eat are dropped, as are
+    corridors that lead back to where they started.
+
+    The nodes are the states of the original problem, with pacman on a key
+    cell, so its heuristic still applies. to_cell_path() turns a path into
+    the path of the original problem.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.maze = problem.maze
+        self.cost = problem.cost
+        self.food_index = problem.food_index
+        self.power_index = problem.power_index
+        self.graph = graph = MazeGraph(problem.maze)
+        start = problem.start_node()
+        moves = graph.moves
+        cells = graph.cells
+        items = set(problem.food_index) | set(problem.power_index) | {start.pos}
+        key = {i for (i, cell) in enumerate(cells)
+               if len(moves[i]) != 2 or cell in items}
+        useless = {i for i in key if len(moves[i]) == 1 and cells[i] not in items}
+        self.key_cells = [cells[i] for i in sorted(key)]
+        self.edges = {cells[i]: {} for i in key}   # cell -> {to_cell: (cost, corridor)}
+        for a in key:
+            for first in moves[a]:
+                prev, here = a, first
+                corridor = []   # the cells passed through
+                cost = self.cost(cells[here])
+                while here not in key:
+                    corridor.append(cells[here])
+                    prev, here = here, next(j for j in moves[here] if j != prev)
+                    cost += self.cost(cells[here])
+                if here == a or here in useless:
+                    continue
+                target = cells[here]
+                if target not in self.edges[cells[a]] or cost < self.edges[cells[a]][target][0]:
+                    self.edges[cells[a]][target] = (cost, corridor)
+        self.num_arcs = sum(len(out) for out in self.edges.values())
+
+    def start_node(self):
+        """returns start node"""
+        return self.problem.start_node()
+
+    def is_goal(self, node):
+        """is True if node is a goal"""
+        return self.problem.is_goal(node)
+
+    def make_state(self, pos, food, power):
+        """returns the state with pacman at pos and the given bitmasks"""
+        return self.problem.make_state(pos, food, power)
+
+    def neighbors(self, node):
+        """returns the list of the arcs from node"""
+        return list(self.successors(node))
+
+    def successors(self, node):
+        """generates the arcs from node to the key cells one corridor away"""
+        for (newpos, (cost, _)) in self.edges[node.pos].items():
+            food = node.food
+            power = node.power
+            if newpos in self.food_index and food >> self.food_index[newpos] & 1:
+                food &= ~(1 << self.food_index[newpos])
+            elif newpos in self.power_index and power >> self.power_index[newpos] & 1:
+                power &= ~(1 << self.power_index[newpos])
+            yield [self.make_state(newpos, food, power), cost]
+
+    def heuristic(self, node):
+        """the heuristic of the original problem"""
+        return self.problem.heuristic(node)
+
+    def heuristic_batch(self, nodes):
+        """returns the list of the heuristic values of nodes"""
+        return self.problem.heuristic_batch(nodes)
+
+    def to_cell_path(self, path):
+        """returns the Path of the original problem that follows path
+        (a path of this problem) one cell at a time"""
+        nodes = list(path.nodes())
+        nodes.reverse()
+        cells = [nodes[0].pos]
+        for node in nodes[1:]:
+            cells.extend(self.edges[cells[-1]][node.pos][1])
+            cells.append(node.pos)
+        cell_path = Path(self.problem.start_node())
+        for cell in cells[1:]:
+            arc = next(arc for arc in self.problem.neighbors(cell_path.end())
+                       if arc[0].pos == cell)
+            cell_path = Path(cell_path, arc)
+        return cell_path
+
+# example queries:
+# junctions = JunctionProblem(Search_problem(maze, lambda n:1, 'foodHeuristic'))
+# path, explored = GraphAStarSearcher(junctions).search()
+# getNodes(junctions.to_cell_path(path))
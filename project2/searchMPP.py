@@ -0,0 +1,106 @@
+# searchMPP.py - Searcher with multiple-path pruning (graph search)
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""A* and lowest-cost-first search as graph searches: a path is only
+expanded if it is the cheapest path found to its end node."""
+
+from searchGeneric import AStarSearcher, UniformCostSearcher
+
+class GraphSearcher(object):
+    """Mixin that turns a priority-queue searcher into a graph searcher.
+    best_g maps each node to the cost of the cheapest path found to it.
+    A path is only added to the frontier if it is cheaper than best_g of
+    its end node (lazy decrease-key): the older, more expensive entries stay
+    in the frontier and are skipped when popped (counted in num_stale).
+    A node that was already expanded is reopened when a cheaper path to it
+    is found (counted in num_reopened), so paths stay optimal even if the
+    heuristic is admissible but not consistent.
+    Paths can be found by repeatedly calling search().
+    """
+    def __init__(self, problem, telemetry=None):
+        self.best_g = {}        # node -> cost of cheapest path found
+        self.expanded = set()   # nodes that have been expanded
+        self.num_stale = 0
+        self.num_reopened = 0
+        super().__init__(problem, telemetry=telemetry)
+
+    def improves(self, node, cost):
+        """is True if cost is less than the cost of every path found to node,
+        in which case best_g is updated"""
+        if node in self.best_g and self.best_g[node] <= cost:
+            return False
+        self.best_g[node] = cost
+        if node in self.expanded:
+            self.expanded.discard(node)
+            self.num_reopened += 1
+        return True
+
+    def add_to_frontier(self, path):
+        """add path to the frontier unless a path as cheap to its end exists"""
+        if self.improves(path.end(), path.cost):
+            super().add_to_frontier(path)
+
+    def add_paths_to_frontier(self, paths):
+        """add the paths that improve on best_g to the frontier"""
+        super().add_paths_to_frontier([path for path in paths
+                                       if self.improves(path.end(), path.cost)])
+
+    def search_steps(self):
+        """the search as a generator, as for Searcher.search_steps"""
+        tel = self.telemetry
+        while not self.empty_frontier():
+            yield
+            if tel: tel.start()     # not counting time spent suspended
+            if tel: frontier_size = len(self.frontier)
+            path = self.frontier.pop()
+            node = path.end()
+            if path.cost > self.best_g[node] or node in self.expanded:
+                self.num_stale += 1     # a cheaper path to node was found
+                continue
+            if tel:
+                tel.expanded(path.depth, frontier_size)
+                tel.lap('frontier')
+            self.expanded.add(node)
+            self.display(2, "Expanding:",path,"(cost:",path.cost,")")
+            self.num_expanded += 1
+            found = self.problem.is_goal(node)
+            if tel: tel.lap('goal_test')
+            if found:    # solution found
+                self.display(1, self.num_expanded, "paths have been expanded,",
+                             self.num_stale, "stale paths skipped and",
+                             len(self.frontier), "paths remain in the frontier")
+                self.solution = path.to_path()   # store the solution found
+                if tel: tel.finish(self.problem, self.solution)
+                return self.solution, self.explored_nodes
+            # only the arcs that improve on best_g are stored
+            new_paths = []
+            num_generated = 0
+            for arc in self.problem.successors(node):
+                num_generated += 1
+                if self.improves(arc[0], path.cost+arc[1]):
+                    new_paths.append(self.store.extend(path,arc))
+            if tel:
+                tel.generated(num_generated, len(new_paths))
+                tel.lap('successors')
+            super().add_paths_to_frontier(new_paths)
+            if tel: tel.lap('frontier')
+            self.display(3,"Frontier:",self.frontier)
+        self.display(1,"No (more) solutions. Total of",
+                     self.num_expanded,"paths expanded and",
+                     self.num_stale,"stale paths skipped.")
+        if tel: tel.finish(self.problem, None)
+        return None, self.explored_nodes
+
+class GraphAStarSearcher(GraphSearcher, AStarSearcher):
+    """A* with a best-g table; optimal for admissible heuristics."""
+    pass
+
+class GraphUniformCostSearcher(GraphSearcher, UniformCostSearcher):
+    """uniform cost search with a best-g table."""
+    pass
+
+# example queries:
+# searcher1 = GraphAStarSearcher(searchProblem.cyclic_delivery_problem)
+# searcher1.search()  # find first path
+# searcher1.num_stale  # number of stale frontier entries skipped
+# searcher1.num_reopened  # number of expanded nodes reopened
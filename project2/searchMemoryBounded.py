@@ -0,0 +1,304 @@
+# searchMemoryBounded.py - Memory-bounded searchers: IDA* and SMA*
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Searchers whose memory use is bounded: iterative deepening A* and
+simplified memory-bounded A*."""
+
+import heapq
+from display import Displayable
+from searchProblem import Path
+
+class IDAStarSearcher(Displayable):
+    """Iterative deepening A*: depth-first searches bounded by f = cost + h,
+    raising the bound to the smallest f that exceeded it.
+    Only the current path and its unexplored siblings are in memory, and a
+    path is never longer than max_nodes nodes.
+    After search():
+    * num_iterations is the number of depth-first searches
+    * num_expanded is the total number of expansions
+    * num_reexpanded is the number of expansions of paths that were within
+      the bound of the previous iteration, so had been expanded before
+    * peak_nodes is the largest number of nodes on the path at once
+    * memory_cutoff is True if a path was cut because of max_nodes (then
+      the search is not complete).
+    explored_nodes is not recorded, to keep memory bounded.
+    """
+    def __init__(self, problem, max_nodes=10000):
+        self.problem = problem
+        self.max_nodes = max_nodes
+        self.num_iterations = 0
+        self.num_expanded = 0
+        self.num_reexpanded = 0
+        self.peak_nodes = 0
+        self.memory_cutoff = False
+        self.explored_nodes = []
+
+    def search(self):
+        """returns a path from the problem's start node to a goal node,
+        and explored_nodes.
+        The path is None if no path was found."""
+        start = self.problem.start_node()
+        bound = self.problem.heuristic(start)
+        previous_bound = -1
+        while bound < float("inf"):
+            self.num_iterations += 1
+            self.display(2, "Iteration", self.num_iterations, "with bound", bound)
+            path, next_bound = self.bounded_dfs(start, bound, previous_bound)
+            if path is not None:
+                self.display(1, self.num_expanded, "paths expanded in",
+                             self.num_iterations, "iterations.")
+                self.solution = path
+                return path, self.explored_nodes
+            previous_bound, bound = bound, next_bound
+        self.display(1, "No path found.", self.num_expanded, "paths expanded.")
+        return None, self.explored_nodes
+
+    def bounded_dfs(self, start, bound, previous_bound):
+        """depth-first search for a goal with f at most bound.
+        Returns (path, None) if found, otherwise (None, smallest f above bound).
+        The stack is explicit, so long paths do not hit the recursion limit."""
+        root = Path(start)
+        if self.problem.is_goal(start):
+            return root, None
+        next_bound = float("inf")
+        on_path = {start}
+        self.expand_count(self.problem.heuristic(start), previous_bound)
+        stack = [(root, self.problem.successors(start))]
+        while stack:
+            path, arcs = stack[-1]
+            arc = next(arcs, None)
+            if arc is None:
+                stack.pop()
+                on_path.discard(path.end())
+                continue
+            node = arc[0]
+            if node in on_path:     # cycle
+                continue
+            child = Path(path, arc)
+            f = child.cost + self.problem.heuristic(node)
+            if f > bound:
+                next_bound = min(next_bound, f)
+            elif self.problem.is_goal(node):
+                return child, None
+            elif len(stack) >= self.max_nodes:
+                self.memory_cutoff = True
+            else:
+                self.expand_count(f, previous_bound)
+                on_path.add(node)
+                stack.append((child, self.problem.successors(node)))
+                self.peak_nodes = max(self.peak_nodes, len(stack))
+        return None, next_bound
+
+    def expand_count(self, f, previous_bound):
+        """updates the expansion counters for expanding a path with value f"""
+        self.num_expanded += 1
+        if f <= previous_bound:
+            self.num_reexpanded += 1
+
+class SMANode(object):
+    """A node of the SMA* search tree.
+    arcs are the arcs out of state (computed when first needed),
+    to_generate are the indexes of the arcs that have never been generated,
+    forgotten maps the index of a pruned child to its backed-up f value."""
+    __slots__ = ('state', 'parent', 'arc', 'arc_index', 'g', 'f', 'depth',
+                 'arcs', 'to_generate', 'forgotten', 'children')
+
+    def __init__(self, state, parent, arc, arc_index, g, f, depth):
+        self.state = state
+        self.parent = parent
+        self.arc = arc
+        self.arc_index = arc_index
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.arcs = None
+        self.to_generate = None
+        self.forgotten = {}
+        self.children = []
+
+    def has_successors(self):
+        """is True if some successor is not in memory"""
+        return self.arcs is None or bool(self.to_generate) or bool(self.forgotten)
+
+class SMAStarSearcher(Displayable):
+    """Simplified memory-bounded A*.
+    At most max_nodes search tree nodes are kept between steps. When a new
+    node does not fit, the leaf with the largest f (the shallowest one for
+    ties) is pruned and its f value is remembered by its parent, which will
+    regenerate it when that is the best thing left to do. Paths that would need more than
+    max_nodes nodes get f = infinity. The path found is optimal among the
+    paths that fit in memory.
+    After search():
+    * num_iterations is the number of successor generations
+    * num_expanded is the number of nodes whose successors were computed
+    * num_reexpanded is the number of pruned nodes that were regenerated
+    * num_pruned is the number of nodes pruned for lack of memory
+    * peak_nodes is the largest number of nodes in memory at once.
+    The open nodes and the prunable leaves are kept in heaps ordered by
+    (f, depth). An f value that changes is pushed again rather than updated,
+    so entries whose node has left the heap's set or has a different f are
+    skipped when they come to the top (as in FrontierBeam), and each step
+    takes logarithmic time.
+    explored_nodes is not recorded, to keep memory bounded.
+    """
+    def __init__(self, problem, max_nodes=10000):
+        assert max_nodes >= 2, "SMA* needs room for at least two nodes"
+        self.problem = problem
+        self.max_nodes = max_nodes
+        self.num_iterations = 0
+        self.num_expanded = 0
+        self.num_reexpanded = 0
+        self.num_pruned = 0
+        self.peak_nodes = 0
+        self.explored_nodes = []
+
+    def search(self):
+        """returns a path from the problem's start node to a goal node,
+        and explored_nodes.
+        The path is None if no path was found within the memory bound."""
+        inf = float("inf")
+        start = self.problem.start_node()
+        root = SMANode(start, None, None, None, 0, self.problem.heuristic(start), 0)
+        self.memory = {root}
+        self.open = {root}
+        self.open_heap = []         # (f, -depth, counter, node)
+        self.leaf_heap = []         # (-f, depth, counter, node)
+        self.counter = 0            # to break ties without comparing nodes
+        self.push(root)
+        self.peak_nodes = 1
+        while self.open:
+            best = self.best_open()
+            if best.f == inf:
+                break
+            if self.problem.is_goal(best.state):
+                self.display(1, self.num_iterations, "generations,",
+                             self.num_pruned, "nodes pruned.")
+                self.solution = self.make_path(best)
+                return self.solution, self.explored_nodes
+            self.num_iterations += 1
+            child = self.generate(best)
+            if not best.has_successors():
+                self.open.discard(best)
+            if child is not None:
+                self.memory.add(child)
+                self.open.add(child)
+                self.push(child)
+            self.backup(best)
+            while len(self.memory) > self.max_nodes:
+                self.prune()
+            self.peak_nodes = max(self.peak_nodes, len(self.memory))
+        self.display(1, "No path found within", self.max_nodes, "nodes.")
+        return None, self.explored_nodes
+
+    def generate(self, node):
+        """generates the next successor of node, or returns None if the arc
+        chosen leads back to a state on the path to node"""
+        if node.arcs is None:
+            node.arcs = list(self.problem.neighbors(node.state))
+            node.to_generate = list(range(len(node.arcs)-1, -1, -1))
+            self.num_expanded += 1
+        if not node.arcs:
+            return None     # dead end
+        if node.to_generate:
+            index = node.to_generate.pop()
+            old_f = None
+        else:
+            index = min(node.forgotten, key=node.forgotten.get)
+            old_f = node.forgotten.pop(index)
+            self.num_reexpanded += 1
+        arc = node.arcs[index]
+        state = arc[0]
+        ancestor = node
+        while ancestor is not None:
+            if ancestor.state == state:
+                return None     # cycle
+            ancestor = ancestor.parent
+        g = node.g + arc[1]
+        child = SMANode(state, node, arc, index, g,
+                        max(node.f, g + self.problem.heuristic(state)), node.depth+1)
+        if old_f is not None:
+            child.f = max(child.f, old_f)
+        if child.depth >= self.max_nodes-1 and not self.problem.is_goal(state):
+            child.f = float("inf")      # no room to go further
+        node.children.append(child)
+        return child
+
+    def push(self, node):
+        """adds entries for node, with its current f, to the open heap if it
+        is open and to the leaf heap if it is a prunable leaf"""
+        self.counter += 1
+        if node in self.open:
+            heapq.heappush(self.open_heap, (node.f, -node.depth, self.counter, node))
+        if not node.children and node.parent is not None:
+            heapq.heappush(self.leaf_heap, (-node.f, node.depth, self.counter, node))
+        if len(self.open_heap)+len(self.leaf_heap) > 4*len(self.memory)+8:
+            self.compact()
+
+    def valid_open(self, entry):
+        """is True if the open heap entry is for an open node with its f"""
+        (f, _, _, node) = entry
+        return node in self.open and f == node.f
+
+    def valid_leaf(self, entry):
+        """is True if the leaf heap entry is for a prunable leaf with its f"""
+        (neg_f, _, _, node) = entry
+        return (node in self.memory and not node.children
+                and node.parent is not None and -neg_f == node.f)
+
+    def best_open(self):
+        """returns the open node with the least f (the deepest for ties)"""
+        while not self.valid_open(self.open_heap[0]):
+            heapq.heappop(self.open_heap)
+        return self.open_heap[0][3]
+
+    def compact(self):
+        """removes the entries that are no longer valid from the heaps"""
+        self.open_heap = [e for e in self.open_heap if self.valid_open(e)]
+        self.leaf_heap = [e for e in self.leaf_heap if self.valid_leaf(e)]
+        heapq.heapify(self.open_heap)
+        heapq.heapify(self.leaf_heap)
+
+    def backup(self, node):
+        """once all successors of node have been generated, its f is the
+        smallest f of its successors; propagates the change to its ancestors"""
+        while node is not None and node.arcs is not None and not node.to_generate:
+            f = min([c.f for c in node.children] + list(node.forgotten.values()),
+                    default=float("inf"))
+            if f == node.f:
+                break
+            node.f = f
+            self.push(node)
+            node = node.parent
+
+    def prune(self):
+        """removes the worst leaf, remembering its f value in its parent"""
+        while not self.valid_leaf(self.leaf_heap[0]):
+            heapq.heappop(self.leaf_heap)
+        worst = heapq.heappop(self.leaf_heap)[3]
+        parent = worst.parent
+        parent.children.remove(worst)
+        parent.forgotten[worst.arc_index] = worst.f
+        self.memory.discard(worst)
+        self.open.discard(worst)
+        self.open.add(parent)
+        self.push(parent)
+        self.num_pruned += 1
+        self.backup(parent)
+
+    def make_path(self, node):
+        """returns the Path from the root to node"""
+        arcs = []
+        while node.parent is not None:
+            arcs.append(node.arc)
+            node = node.parent
+        path = Path(node.state)
+        for arc in reversed(arcs):
+            path = Path(path, arc)
+        return path
+
+# example queries:
+# searcher1 = IDAStarSearcher(searchProblem.cyclic_delivery_problem, max_nodes=100)
+# searcher1.search()
+# searcher2 = SMAStarSearcher(searchProblem.cyclic_delivery_problem, max_nodes=5)
+# searcher2.search()
+# searcher2.num_reexpanded, searcher2.peak_nodes
@@ -0,0 +1,160 @@
+# searchNodeStore.py - Array-backed storage for search tree nodes
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Search tree nodes kept as parent indexes in arrays, with Path-like
+views of them, instead of one linked Path object per node."""
+
+from array import array
+from searchProblem import Path
+
+class NodeStore(object):
+    """The nodes of a search tree, kept in typed arrays.
+    Node i has parent parents[i] (-1 for a root), path cost costs[i],
+    depth (number of arcs) depths[i] and state states[i].
+    That is 24 bytes per node (4+8+4 in the arrays and a reference in
+    states), not counting the states, which the searchers also keep to
+    avoid storing a state twice.
+    costs holds integers until a non-integer cost is added.
+    """
+    def __init__(self):
+        self.parents = array('i')
+        self.costs = array('q')
+        self.depths = array('i')
+        self.states = []
+
+    def add(self, state, parent, cost):
+        """adds a node and returns its id"""
+        self.states.append(state)
+        try:
+            self.costs.append(cost)
+        except TypeError:   # not an integer
+            self.costs = array('d', self.costs)
+            self.costs.append(cost)
+        self.parents.append(parent)
+        self.depths.append(self.depths[parent]+1 if parent >= 0 else 0)
+        return len(self.parents)-1
+
+    def root(self, state):
+        """returns a StoredPath for the path consisting of state only"""
+        return StoredPath(self, self.add(state, -1, 0))
+
+    def extend(self, path, arc):
+        """returns a StoredPath for path (a StoredPath) followed by arc"""
+        return StoredPath(self, self.add(arc[0], path.id, self.costs[path.id]+arc[1]))
+
+    def state(self, i):
+        """returns the state of node i"""
+        return self.states[i]
+
+    def path(self, i):
+        """returns the Path from the root to node i"""
+        ids = []
+        while i >= 0:
+            ids.append(i)
+            i = self.parents[i]
+        ids.reverse()
+        path = Path(self.state(ids[0]))
+        for (prev, i) in zip(ids, ids[1:]):
+            path = Path(path, [self.state(i), self.costs[i]-self.costs[prev]])
+        return path
+
+    def explored_nodes(self):
+        """returns the position (for Pacman states) or else the state itself,
+        of every state reached, except the first one, in the order first
+        reached"""
+        return [getattr(state, 'pos', state)
+                for state in dict.fromkeys(self.states[1:])]
+
+    def __len__(self):
+        return len(self.parents)
+
+    def nbytes(self):
+        """bytes used by the arrays and the states list (not counting the
+        states themselves)"""
+        return (sum(a.itemsize*len(a) for a in (self.parents, self.costs, self.depths))
+                + 8*len(self.states))
+
+class StoredPath(object):
+    """A handle on a node of a NodeStore that behaves like a Path:
+    it has cost, end(), nodes() and initial_nodes().
+    to_path() rebuilds an ordinary Path.
+    """
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, i):
+        self.store = store
+        self.id = i
+
+    @property
+    def cost(self):
+        return self.store.costs[self.id]
+
+    def end(self):
+        """returns the node at the end of the path"""
+        return self.store.state(self.id)
+
+    def nodes(self):
+        """enumerates the nodes for the path, from the end backwards."""
+        i = self.id
+        while i >= 0:
+            yield self.store.state(i)
+            i = self.store.parents[i]
+
+    def initial_nodes(self):
+        """enumerates the nodes for the path before the end node, backwards."""
+        i = self.store.parents[self.id]
+        while i >= 0:
+            yield self.store.state(i)
+            i = self.store.parents[i]
+
+    @property
+    def depth(self):
+        """the number of arcs in the path"""
+        return self.store.depths[self.id]
+
+    def to_path(self):
+        """returns the Path this stands for"""
+        return self.store.path(self.id)
+
+    def __repr__(self):
+        """returns a string representation of a path"""
+        return " --> ".join(str(n) for n in reversed(list(self.nodes())))
+
+class LinkedPath(Path):
+    """A Path that also has its depth (number of arcs); to_path() returns
+    the path itself."""
+    def __init__(self, initial, arc=None):
+        Path.__init__(self, initial, arc)
+        self.depth = 0 if arc is None else initial.depth+1
+
+    def to_path(self):
+        """returns the Path this stands for"""
+        return self
+
+class PathStore(object):
+    """Makes the paths of a search as LinkedPaths, which only refer to
+    their parent paths. So, unlike a NodeStore, nothing is kept for a node
+    once no path through it is kept: when a beam search drops a path, the
+    nodes only it used are freed.
+    len() is the number of nodes made; explored_nodes() is empty, as the
+    nodes are not recorded.
+    """
+    def __init__(self):
+        self.num_nodes = 0
+
+    def root(self, state):
+        """returns the path consisting of state only"""
+        self.num_nodes += 1
+        return LinkedPath(state)
+
+    def extend(self, path, arc):
+        """returns path followed by arc"""
+        self.num_nodes += 1
+        return LinkedPath(path, arc)
+
+    def explored_nodes(self):
+        """returns the empty list: the nodes reached are not recorded"""
+        return []
+
+    def __len__(self):
+        return self.num_nodes
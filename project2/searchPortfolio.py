@@ -0,0 +1,140 @@
+# searchPortfolio.py - Run several searchers in parallel on one problem
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""A searcher that runs several searchers on a problem in separate
+processes and returns the first path found."""
+
+import multiprocessing
+import queue
+import time
+from display import Displayable
+from searchProblem import Path
+from searchGeneric import Searcher, BFSearcher, AStarSearcher, UniformCostSearcher
+
+default_portfolio = {'DFS':Searcher, 'BFS':BFSearcher,
+                     'A*':AStarSearcher, 'UCS':UniformCostSearcher}
+
+def portfolio_worker(name, searcher_class, problem, results):
+    """runs searcher_class on problem and puts
+    (name, nodes, costs, num_expanded, seconds) on the results queue,
+    where nodes are the nodes of the path from the start and costs the
+    arc costs; nodes is None if no path was found"""
+    start_time = time.perf_counter()
+    try:
+        searcher = searcher_class(problem)
+        path, _ = searcher.search()
+        nodes, costs = None, None
+        if path is not None and problem.is_goal(path.end()):
+            nodes, costs = [], []
+            while path.arc is not None:
+                nodes.append(path.arc[0])
+                costs.append(path.arc[1])
+                path = path.initial
+            nodes.append(path.initial)
+            nodes.reverse()
+            costs.reverse()
+        results.put((name, nodes, costs, searcher.num_expanded,
+                     time.perf_counter()-start_time))
+    except Exception as e:
+        results.put((name, None, repr(e), 0, time.perf_counter()-start_time))
+
+class PortfolioSearcher(Displayable):
+    """Runs several searchers on the same problem, each in its own process.
+    searchers is a name:searcher_class dictionary.
+    search() returns the first path found, or, if wait_for_best is True,
+    the cheapest path found by the searchers that finish before the
+    deadline (in seconds; None means no deadline). The other searchers are
+    terminated. After search():
+    * winner is the name of the searcher whose path was returned
+    * results maps the name of each searcher that finished to
+      (path cost or None, number of paths expanded, seconds)
+    * exit_codes maps the name of each searcher whose process ended without
+      a result (e.g. killed for lack of memory) to its exit code; it is in
+      results too, with no path.
+    The problem is passed to the workers by forking where the platform
+    supports it, so it does not need to be picklable; the nodes of the
+    solution are sent back with pickle.
+    The results are polled every poll_interval seconds, checking in between
+    that the workers without a result are still running, so search() does
+    not wait for a worker that has died.
+    """
+    poll_interval = 0.1
+
+    def __init__(self, problem, searchers=default_portfolio, deadline=None,
+                 wait_for_best=False):
+        self.problem = problem
+        self.searchers = dict(searchers)
+        self.deadline = deadline
+        self.wait_for_best = wait_for_best
+        self.winner = None
+        self.results = {}
+        self.exit_codes = {}
+        self.explored_nodes = []
+
+    def search(self):
+        """returns the path chosen (None if there is none) and explored_nodes"""
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        results = context.Queue()
+        workers = {name: context.Process(target=portfolio_worker,
+                                         args=(name, searcher_class, self.problem, results),
+                                         daemon=True)
+                   for (name, searcher_class) in self.searchers.items()}
+        for worker in workers.values():
+            worker.start()
+        start_time = time.monotonic()
+        end_time = None if self.deadline is None else start_time+self.deadline
+        pending = dict(workers)     # the workers that have not given a result
+        dead = set()    # pending workers seen to have exited at the last poll
+        best = None     # (cost, name, path)
+        try:
+            while pending:
+                timeout = self.poll_interval
+                if end_time is not None:
+                    timeout = min(timeout, max(0, end_time-time.monotonic()))
+                try:
+                    (name, nodes, costs, num_expanded, seconds) = results.get(timeout=timeout)
+                except queue.Empty:
+                    if end_time is not None and time.monotonic() >= end_time:
+                        self.display(1, "Deadline reached.")
+                        break
+                    # a worker's result is in the queue before it exits, so one
+                    # that was dead at the last poll and still has no result died
+                    for name in dead & set(pending):
+                        self.exit_codes[name] = pending.pop(name).exitcode
+                        self.results[name] = (None, 0, time.monotonic()-start_time)
+                        self.display(1, name, "died with exit code", self.exit_codes[name])
+                    dead = {name for (name, worker) in pending.items()
+                            if not worker.is_alive()}
+                    continue
+                del pending[name]
+                if nodes is None:
+                    self.results[name] = (None, num_expanded, seconds)
+                    if costs is not None:
+                        self.display(1, name, "failed:", costs)
+                    continue
+                path = Path(nodes[0])
+                for (node, cost) in zip(nodes[1:], costs):
+                    path = Path(path, [node, cost])
+                self.results[name] = (path.cost, num_expanded, seconds)
+                self.display(2, name, "found a path of cost", path.cost,
+                             "in", seconds, "seconds")
+                if best is None or path.cost < best[0]:
+                    best = (path.cost, name, path)
+                if not self.wait_for_best:
+                    break
+        finally:
+            for worker in workers.values():
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+        if best is None:
+            return None, self.explored_nodes
+        (_, self.winner, self.solution) = best
+        self.display(1, "Path from", self.winner, "of cost", self.solution.cost)
+        return self.solution, self.explored_nodes
+
+# example queries:
+# portfolio = PortfolioSearcher(searchProblem.cyclic_delivery_problem, deadline=5)
+# portfolio.search()
+# portfolio.winner, portfolio.results
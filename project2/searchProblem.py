@@ -9,27 +9,161 @@
 # See: http://creativecommons.org/licenses/by-nc-sa/4.0/deed.en
 
 from pacman import *
+from collections import OrderedDict
+import numpy as np
 import inspect
 import time
 
 
+class PacmanState(object):
+    """An immutable Pacman search state.
+
+    pos is pacman's (x,y) position; food and power are integer bitmasks
+    where bit i is set if the i-th food (power) item of the problem is still
+    uncollected. Hashing and equality only look at (pos, food, power).
+    food_cells and power_cells are the problem's shared tuples of item
+    positions, so that node[1] and node[2] can still give position lists.
+    """
+    __slots__ = ('pos', 'food', 'power', 'food_cells', 'power_cells', '_hash')
+
+    def __init__(self, pos, food, power, food_cells, power_cells):
+        self.pos = pos
+        self.food = food
+        self.power = power
+        self.food_cells = food_cells
+        self.power_cells = power_cells
+        self._hash = hash((pos, food, power))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return (isinstance(other, PacmanState) and self.pos == other.pos
+                and self.food == other.food and self.power == other.power)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __getitem__(self, i):
+        """node[0] is the position, node[1] the remaining food positions and
+        node[2] the remaining power positions, as in the list encoding"""
+        if i == 0:
+            return self.pos
+        elif i == 1:
+            return unpack_cells(self.food, self.food_cells)
+        elif i == 2:
+            return unpack_cells(self.power, self.power_cells)
+        raise IndexError(i)
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return str([self[0], self[1], self[2]])
+
+def unpack_cells(mask, cells):
+    """returns the list of cells whose bit is set in mask"""
+    res = []
+    while mask:
+        low = mask & -mask
+        res.append(cells[low.bit_length()-1])
+        mask ^= low
+    return res
+
+def pack_cells(positions, index):
+    """returns the bitmask of positions, given a position:bit index dict"""
+    mask = 0
+    for p in positions:
+        mask |= 1 << index[tuple(p)]
+    return mask
+
+class LRUCache(object):
+    """A dictionary with at most maxsize entries; when it is full the least
+    recently used entry is evicted. hits, misses and evictions count the
+    lookups and evictions since the cache was created (or cleared)."""
+    def __init__(self, maxsize):
+        assert maxsize > 0, "cache size must be positive"
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """returns the value for key (marking it as recently used),
+        or default if key is not in the cache"""
+        if key in self.data:
+            self.hits += 1
+            self.data.move_to_end(key)
+            return self.data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """adds key:value, evicting the least recently used entry if full"""
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """returns a dictionary of the cache counters"""
+        lookups = self.hits + self.misses
+        return {'size':len(self.data), 'maxsize':self.maxsize,
+                'hits':self.hits, 'misses':self.misses,
+                'evictions':self.evictions,
+                'hit_rate':self.hits/lookups if lookups else 0.0}
+
 class Search_problem(object):
     """A search problem consists of:
     * a start node
     * a neighbors function that gives the neighbors of a node
     * a specification of a goal
     * a (optional) heuristic function.
-    The methods must be overridden to define a search problem."""
-    def __init__(self, maze, cost=lambda n: 1, heuristic=None):
+    The methods must be overridden to define a search problem.
+    oracle is an optional mazeDistances.DistanceOracle; when given, the
+    corners and food heuristics use exact maze distances (admissible when
+    every move costs at least 1).
+    heuristic_cache_size, if given, memoizes the heuristic in an LRUCache of
+    that many entries, keyed on (position, remaining food); see
+    heuristic_cache_stats().
+    heuristic_batch only uses NumPy when there are at least
+    batch_threshold (node, food item) pairs; for fewer, the set-up costs
+    more than calling the heuristic on each node."""
+    batch_threshold = 128
+
+    def __init__(self, maze, cost=lambda n: 1, heuristic=None, oracle=None,
+                 heuristic_cache_size=None):
         print(cost, heuristic)
         self.maze = maze
         self.explored = set()
         self.cost = cost
+        self.oracle = oracle
+        # food and power items are numbered once, so states can use bitmasks
+        _pos, _food, _power = maze.state
+        self.food_cells = tuple(tuple(f) for f in _food)
+        self.power_cells = tuple(tuple(p) for p in _power)
+        self.food_index = {f:i for (i,f) in enumerate(self.food_cells)}
+        self.power_index = {p:i for (i,p) in enumerate(self.power_cells)}
+        self.food_array = np.array(self.food_cells, dtype=int).reshape(-1, 2)
+        self.food_bytes = (len(self.food_cells)+7)//8
+        self.heuristic_name = heuristic
         #print('heuristics: ',heuristic,'   cost:', cost)
         if (heuristic==None):
             self.heuristic = lambda n: 0
         elif heuristic=='h1':
-            self.heuristic = lambda n: len(n[1])
+            self.heuristic = lambda n: bin(n.food).count('1')
         elif heuristic=='h2':
             self.heuristic = self.heuristicManhattan
         elif heuristic=='cornersHeuristic':
@@ -38,47 +172,156 @@ class Search_problem(object):
             self.heuristic = self.heuristicFood
         else:
             self.heuristic = lambda n: 0
+        self.uncached_heuristic = self.heuristic
+        self.heuristic_cache = None
+        if heuristic_cache_size:
+            self.heuristic_cache = LRUCache(heuristic_cache_size)
+            self.heuristic = self.cached_heuristic
+        self.heuristic_batch = self.maze_heuristic_batch
+        if type(self).neighbors is Search_problem.neighbors:
+            self.successors = self.maze_successors   # lazy for the maze
+
+    def cached_heuristic(self, n):
+        """the heuristic value of n, looked up in the heuristic cache first.
+        Power pellets do not change the heuristics, so they are not in the key."""
+        key = (n.pos, n.food)
+        value = self.heuristic_cache.get(key)
+        if value is None:
+            value = self.uncached_heuristic(n)
+            self.heuristic_cache.put(key, value)
+        return value
+
+    def heuristic_batch(self, nodes):
+        """returns the list of the heuristic values of nodes"""
+        return [self.heuristic(n) for n in nodes]
+
+    def maze_heuristic_batch(self, nodes):
+        """returns the list of the heuristic values of nodes of the maze.
+        The Manhattan and maze distance heuristics are computed for all
+        the nodes at once with NumPy; other heuristics are called per node.
+        Uses (and fills) the heuristic cache, if there is one."""
+        if self.heuristic_cache is not None:
+            values = [self.heuristic_cache.get((n.pos, n.food)) for n in nodes]
+            to_do = [i for (i,v) in enumerate(values) if v is None]
+            computed = self.uncached_heuristic_batch([nodes[i] for i in to_do])
+            for (i,v) in zip(to_do, computed):
+                values[i] = v
+                self.heuristic_cache.put((nodes[i].pos, nodes[i].food), v)
+            return values
+        return self.uncached_heuristic_batch(nodes)
+
+    def uncached_heuristic_batch(self, nodes):
+        """heuristic_batch without the cache"""
+        if not nodes:
+            return []
+        if self.heuristic_name == 'h1':
+            return [bin(n.food).count('1') for n in nodes]
+        if (self.heuristic_name in ('h2', 'cornersHeuristic', 'foodHeuristic')
+                and len(nodes)*len(self.food_cells) >= self.batch_threshold):
+            (_, maxs) = self.food_distance_bounds(nodes,
+                        maze_distance=self.heuristic_name != 'h2')
+            return maxs.tolist()
+        return [self.uncached_heuristic(n) for n in nodes]
+
+    def food_distance_bounds(self, nodes, maze_distance=True):
+        """returns two arrays with, for each node, the distance from pacman to
+        the nearest and to the furthest remaining food (0 if there is none).
+        The distances are maze distances when maze_distance is true and the
+        problem has an oracle, and Manhattan distances otherwise."""
+        food_masks = [n.food for n in nodes]
+        union = 0
+        for mask in food_masks:
+            union |= mask
+        if union == 0:
+            zeros = np.zeros(len(nodes), dtype=int)
+            return zeros, zeros
+        # bits[k,i] is 1 if the i-th food item is left in the k-th node
+        bits = np.unpackbits(np.frombuffer(b"".join(
+                    mask.to_bytes(self.food_bytes, 'little') for mask in food_masks),
+                    dtype=np.uint8).reshape(len(nodes), -1),
+                axis=1, bitorder='little')[:, :len(self.food_cells)]
+        used = np.flatnonzero(bits.any(axis=0))
+        left = bits[:, used].astype(bool)
+        positions = [n.pos for n in nodes]
+        dist = None
+        if maze_distance and self.oracle is not None:
+            index = self.oracle.index
+            food = [self.food_cells[i] for i in used]
+            if all(p in index for p in positions) and all(f in index for f in food):
+                rows = np.array([index[p] for p in positions])
+                cols = np.array([index[f] for f in food])
+                dist = self.oracle.matrix[rows[:, None], cols[None, :]].astype(int)
+        if dist is None:
+            pos_array = np.array(positions, dtype=int).reshape(-1, 2)
+            dist = np.abs(pos_array[:, None, :]
+                          - self.food_array[used][None, :, :]).sum(axis=2)
+        big = np.iinfo(int).max
+        mins = np.where(left, dist, big).min(axis=1)
+        maxs = np.where(left, dist, -1).max(axis=1)
+        has_food = left.any(axis=1)
+        return np.where(has_food, mins, 0), np.where(has_food, maxs, 0)
+
+    def heuristic_cache_stats(self):
+        """returns the hit/miss/eviction counters of the heuristic cache"""
+        if self.heuristic_cache is None:
+            return None
+        return self.heuristic_cache.stats()
     
     def start_node(self):
         """returns start node"""
         # print('start = ',self.maze.state)
-        return self.maze.state
+        _pos, _food, _power = self.maze.state
+        return self.make_state(tuple(_pos), pack_cells(_food, self.food_index),
+                               pack_cells(_power, self.power_index))
         #raise NotImplementedError("start_node")   # abstract method
+
+    def make_state(self, pos, food, power):
+        """returns the state with pacman at pos and the given bitmasks"""
+        return PacmanState(pos, food, power, self.food_cells, self.power_cells)
     
     def is_goal(self,node):
         """is True if node is a goal"""
-        return (len(node[1])==0)
+        return node.food == 0
         #raise NotImplementedError("is_goal")   # abstract method
     
+    def successors(self,node):
+        """returns an iterator over the arcs for the neighbors of node.
+        Override this (and neighbors to use it) to generate them lazily."""
+        return iter(self.neighbors(node))
+
+    def maze_successors(self,node):
+        """generates the arcs for the neighbors of node in the maze, one at
+        a time. The food and power bitmasks are ints, so a successor shares
+        them with node unless its move eats something."""
+        _pos = node.pos
+        for _dir in self.maze.legalMoves(_pos):
+            _food = node.food
+            _power = node.power
+            _newpos = tuple(self.maze.makeMove(_pos,_dir))
+            if _newpos in self.food_index and _food >> self.food_index[_newpos] & 1:
+                _food &= ~(1 << self.food_index[_newpos])
+            elif _newpos in self.power_index and _power >> self.power_index[_newpos] & 1:
+                _power &= ~(1 << self.power_index[_newpos])
+            yield [self.make_state(_newpos,_food,_power), self.cost(_newpos)] # add cost to end, note the difference with explicit graph search
+
     def neighbors(self,node):
         """returns a list of the arcs for the neighbors of node"""
-        _pos = node[0]
-        _legal = self.maze.legalMoves(node[0])
-        _neighbors = []
-        for _dir in _legal:
-            _food = node[1].copy()
-            _power = node[2].copy()
-            _newpos = self.maze.makeMove(_pos,_dir)
-            if (_newpos in _food):
-                _food.remove(_newpos)
-            elif (_newpos in _power):
-                _power.remove(_newpos)
-            _neighbors.append([[_newpos,_food,_power], self.cost(_newpos)]) # add cost to end, note the difference with explicit graph search
-        return _neighbors
+        return list(self.maze_successors(node))
         #raise NotImplementedError("neighbors")   # abstract method
     
     def heuristicManhattan(self,n):
         """Gives the heuristic value of node n.
         Returns 0 if not overridden."""
         _pos = n[0]
-        if (len(n[1])==0):
+        _foodlist = n[1]    # n[1] is the list of all remaining food items
+        if (len(_foodlist)==0):
             return 0
-        _foodpos = n[1][0]    # n[1] is the list of all food items
+        _foodpos = _foodlist[0]
         # Manhattan distance between the food and the current pacman position,
         # works for single food item search
         i=0
-        while i<len(n[1]):
-            _food= n[1][i]
+        while i<len(_foodlist):
+            _food= _foodlist[i]
             if (abs(_pos[0]-_food[0])+abs(_pos[1]-_food[1])) > (abs(_pos[0]-_foodpos[0])+abs(_pos[1]-_foodpos[1])):
                 _foodpos= _food
             i+=1
@@ -89,16 +332,23 @@ class Search_problem(object):
         Returns 0 if not overridden."""
         return 0
     
+    def heuristicMazeDistance(self, n):
+        """Gives the maze distance from pacman to the furthest remaining food,
+        using the distance oracle."""
+        _pos = n[0]
+        return max((self.oracle.distance(_pos, _food) for _food in n[1]), default=0)
+
     def heuristicCorners(self, n):
         """Gives the heuristic value of node n.
         Returns 0 if not overridden."""
-         
+        if self.oracle is not None:
+            return self.heuristicMazeDistance(n)
         x= self.heuristicManhattan(n)
         return x
 
     def heuristicFood(self, n):
-        n_pos=n[0]
-        n_foodList=n[1]
+        if self.oracle is not None:
+            return self.heuristicMazeDistance(n)
         x= self.heuristicManhattan(n)
         return x
 
@@ -154,6 +404,10 @@ class Search_problem_from_explicit_graph(Search_problem):
         """returns the neighbors of node"""
         return self.neighs[node]
 
+    def successors(self,node):
+        """returns an iterator over the arcs out of node"""
+        return iter(self.neighs[node])
+
     def heuristic(self,node):
         """Gives the heuristic value of node n.
         Returns 0 if not overridden in the hmap."""
@@ -161,6 +415,10 @@ class Search_problem_from_explicit_graph(Search_problem):
             return self.hmap[node]
         else:
             return 0
+
+    def heuristic_batch(self, nodes):
+        """returns the list of the heuristic values of nodes"""
+        return [self.hmap.get(node, 0) for node in nodes]
         
     def __repr__(self):
         """returns a string representation of the search problem"""
@@ -173,6 +431,15 @@ class Search_problem_from_explicit_graph(Search_problem):
         """returns an iterator over the neighbors of node"""
         return (path.to_node for path in self.neighs[node])
 
+    def predecessors(self,node):
+        """returns the arcs into node, as [from_node, cost] pairs.
+        The reverse adjacency is built on the first call."""
+        if not hasattr(self, 'rneighs'):
+            self.rneighs = {n:[] for n in self.nodes}
+            for arc in self.arcs:
+                self.rneighs[arc.to_node].append([arc.from_node, arc.cost])
+        return self.rneighs.get(node, [])
+
 class Path(object):
     """A path is either a node or a path followed by an arc"""
     
@@ -341,21 +608,99 @@ def FindClosestDot(pacman_pos, food):
     return _closest
     
 
-def findPathToClosestDot(problem, pacman_pos, closest):
+def findPathToClosestDot(problem, pacman_pos, closest, cache=None):
     """
     You need to implement the problem.maze.state and the search call
+    If cache (a pathCache.PathCache) is given, a result found before in a
+    maze with the same layout is reused instead of searching again.
     """
     from searchGeneric import AStarSearcher
 	#import searcher to create a food problem then search 
     problem.maze.state[0] = pacman_pos
     problem.maze.state[1] = [closest]
     maze = problem.maze 
+    if cache is not None:
+        _key = (cache.layout_hash(maze), tuple(pacman_pos), tuple(closest))
+        _result = cache.get(*_key)
+        if _result is not None:
+            return _result
     closestDotSearch = AStarSearcher(Search_problem(maze, lambda n:1, 'foodHeuristic'))
-    return closestDotSearch.search() 
+    _result = closestDotSearch.search()
+    if cache is not None:
+        cache.put(*_key, _result)
+    return _result
 
 
-def ClosestDotSearchAgent(problem):
+def findPathToNearestDot(graph, pacman_pos, food, oracle=None, cache=None):
+    """returns a path from pacman_pos to the nearest food by maze distance,
+    and the list of explored cells.
+    graph is the mazeGraph.MazeGraph of the maze; its move table is reused
+    by every call. The path is found by a single breadth-first sweep that
+    stops at the first food cell reached. If oracle (a DistanceOracle of the
+    same maze) is given, no sweep is needed: the nearest food is read off
+    pacman's row of the distance matrix and the path follows decreasing
+    distances.
+    The nodes of the path are states of the one-food problem for that food,
+    as for findPathToClosestDot.
+    If cache (a pathCache.PathCache) is given, results are cached under the
+    layout hash of graph, pacman_pos and the set of food cells.
+    """
+    if cache is not None:
+        key = (graph.layout_hash, tuple(pacman_pos), frozenset(tuple(f) for f in food))
+        result = cache.get(*key)
+        if result is None:
+            result = findPathToNearestDot(graph, pacman_pos, food, oracle)
+            cache.put(*key, result)
+        return result
+    index = graph.index
+    moves = graph.moves
+    source = index[tuple(pacman_pos)]
+    targets = {index[tuple(f)] for f in food if tuple(f) in index}
+    if not targets:
+        return None, []
+    explored = []
+    if oracle is not None:
+        row = oracle.matrix[source]
+        target = min(targets, key=lambda t: (row[t], t))
+        cells = [target]
+        while cells[-1] != source:  # step back to a cell one move closer
+            here = cells[-1]
+            cells.append(next(j for j in moves[here]
+                              if oracle.matrix[source, j] == oracle.matrix[source, here]-1))
+            explored.append(graph.cells[cells[-1]])
+        cells.reverse()
+    else:
+        parent = {source: None}
+        layer = [source]
+        target = source if source in targets else None
+        while target is None and layer:
+            next_layer = []
+            for i in layer:
+                for j in moves[i]:
+                    if j not in parent:
+                        parent[j] = i
+                        explored.append(graph.cells[j])
+                        if j in targets and target is None:
+                            target = j
+                        next_layer.append(j)
+            layer = next_layer
+        if target is None:
+            return None, explored
+        cells = [target]
+        while parent[cells[-1]] is not None:
+            cells.append(parent[cells[-1]])
+        cells.reverse()
+    goal = (graph.cells[target],)
+    path = Path(PacmanState(graph.cells[cells[0]], int(cells[0] != target), 0, goal, ()))
+    for i in cells[1:]:
+        path = Path(path, [PacmanState(graph.cells[i], int(i != target), 0, goal, ()), 1])
+    return path, explored
+
+def ClosestDotSearchAgent(problem, cache=None):
     from runPacman import getNodes
+    from mazeGraph import maze_graph
+    _graph = maze_graph(problem.maze)   # one move table for all the sweeps
+    _oracle = getattr(problem, 'oracle', None)
     _food = problem.maze.food
     _power = problem.maze.power
     _pacman_pos = problem.maze.pacman_pos
@@ -363,16 +708,16 @@ def ClosestDotSearchAgent(problem):
     _full_path = [_pacman_pos]
     _explored = _full_path
     while len(_food) > 0:
-        _closest = FindClosestDot(_pacman_pos, _food)
-        _path, _explored1 = findPathToClosestDot(problem, _pacman_pos, _closest)
+        _path, _explored1 = findPathToNearestDot(_graph, _pacman_pos, _food, _oracle, cache)
+        if _path is None:   # the remaining food cannot be reached
+            break
         path = getNodes(_path)
         _cost = _cost + len(path) - 1
-        for _p in path[1:]:
-            if _p in _food:
-                _food.remove(_p)
+        _eaten = set(path)      # including path[0], if pacman starts on food
+        _food[:] = [f for f in _food if tuple(f) not in _eaten]
         _full_path = _full_path + path[1:]
         _explored = _explored + _explored1
-        _pacman_pos = _closest
+        _pacman_pos = path[-1]
     print('Total past cost is ',_cost)
     return _full_path, _explored
 
@@ -0,0 +1,131 @@
+# searchTelemetry.py - Statistics collected during a search
+# Written for the artificial_Intelligence projects; not part of the AIFCA code.
+
+"""Statistics of a search: paths expanded by depth, time per phase, the
+effective branching factor and the heuristic error along the solution."""
+
+import json
+import time
+
+class SearchTelemetry(object):
+    """Statistics of a search, filled in by a Searcher whose telemetry
+    attribute is this object:
+    * num_generated is the number of arcs generated, num_expanded the number
+      of paths expanded, and num_duplicates the number of generated arcs
+      that were not added to the frontier
+    * peak_frontier is the largest frontier size seen
+    * depth_histogram maps a depth to the number of paths of that length
+      expanded
+    * phase_seconds maps each phase of the search loop ('frontier',
+      'goal_test', 'successors') to the wall time spent in it
+    * solution is filled in by finish(): the depth and cost of the path,
+      the effective branching factor, and for each node on the path its
+      heuristic value and the cost from it to the end of the path.
+    """
+    def __init__(self):
+        self.num_generated = 0
+        self.num_expanded = 0
+        self.num_duplicates = 0
+        self.peak_frontier = 0
+        self.depth_histogram = {}
+        self.phase_seconds = {}
+        self.solution = None
+        self.last_time = None
+
+    def start(self):
+        """starts (or restarts) timing; the searchers call it before each
+        expansion, so time the search spends suspended is not counted"""
+        self.last_time = time.perf_counter()
+
+    def lap(self, phase):
+        """adds the time since the last lap (or start) to phase"""
+        now = time.perf_counter()
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + now-self.last_time
+        self.last_time = now
+
+    def expanded(self, depth, frontier_size):
+        """records the expansion of a path of length depth, popped from a
+        frontier that had frontier_size elements"""
+        self.num_expanded += 1
+        self.depth_histogram[depth] = self.depth_histogram.get(depth, 0)+1
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+
+    def generated(self, num_generated, num_added):
+        """records that an expansion generated num_generated arcs, of which
+        num_added were added to the frontier"""
+        self.num_generated += num_generated
+        self.num_duplicates += num_generated-num_added
+
+    def finish(self, problem, path):
+        """records the solution path (a Path, or None) of problem"""
+        if path is None:
+            self.solution = None
+            return
+        nodes = list(path.nodes())      # from the end backwards
+        costs = []                      # costs[i] is the cost to go from nodes[i]
+        cost_to_go = 0
+        p = path
+        while p.arc is not None:
+            costs.append(cost_to_go)
+            cost_to_go += p.arc[1]
+            p = p.initial
+        costs.append(cost_to_go)
+        along = []
+        for (node, cost) in zip(reversed(nodes), reversed(costs)):
+            h = problem.heuristic(node)
+            along.append({'node':str(node), 'h':h, 'cost_to_go':cost, 'error':cost-h})
+        depth = len(nodes)-1
+        self.solution = {'depth':depth, 'cost':path.cost,
+                         'effective_branching_factor':
+                             effective_branching_factor(self.num_expanded, depth),
+                         'heuristic_along_path':along}
+
+    def as_dict(self):
+        """returns the telemetry as a dictionary of JSON-compatible values"""
+        return {'num_generated':self.num_generated,
+                'num_expanded':self.num_expanded,
+                'num_duplicates':self.num_duplicates,
+                'peak_frontier':self.peak_frontier,
+                'depth_histogram':{str(d):n for (d,n) in sorted(self.depth_histogram.items())},
+                'phase_seconds':self.phase_seconds,
+                'solution':self.solution}
+
+    def to_json(self, filename=None):
+        """returns the telemetry as a JSON string; writes it to filename too
+        if one is given"""
+        text = json.dumps(self.as_dict(), indent=2, default=str)
+        if filename is not None:
+            with open(filename, 'w') as f:
+                f.write(text)
+        return text
+
+def effective_branching_factor(num_expanded, depth, tolerance=1e-6):
+    """returns b such that a uniform tree of the given depth with branching
+    factor b has num_expanded+1 nodes: num_expanded+1 = 1+b+b^2+...+b^depth.
+    Returns None if depth is 0."""
+    if depth == 0:
+        return None
+    target = num_expanded+1
+    def tree_size(b):
+        if b == 1:
+            return depth+1
+        try:
+            return (b**(depth+1)-1)/(b-1)
+        except OverflowError:
+            return float("inf")
+    low, high = 1.0, max(1.0, float(num_expanded))
+    if tree_size(low) >= target:
+        return low
+    while high-low > tolerance:
+        mid = (low+high)/2
+        if tree_size(mid) < target:
+            low = mid
+        else:
+            high = mid
+    return (low+high)/2
+
+# example queries:
+# searcher = AStarSearcher(problem, telemetry=SearchTelemetry())
+# searcher.search()
+# searcher.telemetry.to_json("astar.json")
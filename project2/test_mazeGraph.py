@@ -0,0 +1,86 @@
+# test_mazeGraph.py - Tests of the maze graph and the caches keyed by its layout
+
+import contextlib
+import io
+import pytest
+
+pytest.importorskip("pacman")
+pytest.importorskip("display")
+from searchBenchmark import generate_maze
+from searchProblem import Search_problem, findPathToClosestDot
+from mazeGraph import maze_graph, Walls
+from pathCache import PathCache
+from mazeQueries import MazeQueries, maze_queries
+
+def cells_of(path):
+    """the cells pacman goes through on path, from the start"""
+    return [node[0] for node in reversed(list(path.nodes()))]
+
+def closest_dot_path(maze, start, goal, cache):
+    with contextlib.redirect_stdout(io.StringIO()):     # Search_problem prints
+        problem = Search_problem(maze, lambda n: 1, 'foodHeuristic')
+        (path, _) = findPathToClosestDot(problem, start, goal, cache)
+    return path
+
+def test_wall_changes_give_a_new_graph():
+    maze = generate_maze(15, 15, 0.2, 1, seed=3)
+    graph = maze_graph(maze)
+    assert maze_graph(maze) is graph
+    cell = next(c for c in graph.cells if c != maze.pacman_pos)
+    maze.walls.add(cell)
+    assert maze_graph(maze) is not graph
+    assert not maze_graph(maze).is_open(cell)
+
+def test_plain_set_walls_are_counted():
+    maze = generate_maze(15, 15, 0.2, 1, seed=3)
+    maze.walls = set(maze.walls)
+    graph = maze_graph(maze)
+    assert isinstance(maze.walls, Walls)
+    maze.walls |= {next(c for c in graph.cells if c != maze.pacman_pos)}
+    assert maze_graph(maze) is not graph
+
+def test_cached_path_is_not_reused_after_a_wall_change():
+    maze = generate_maze(12, 12, 0.15, 1, seed=1)
+    start, goal = maze.pacman_pos, tuple(maze.food[0])
+    cache = PathCache()
+    path = closest_dot_path(maze, start, goal, cache)
+    assert closest_dot_path(maze, start, goal, cache) is path
+    # wall in a cell of the path that the goal can still be reached without
+    for blocked in cells_of(path)[1:-1]:
+        maze.walls.add(blocked)
+        if maze_graph(maze).is_open(goal):
+            break
+        maze.walls.discard(blocked)
+    else:
+        pytest.fail("no cell of the path can be walled in")
+    new_path = closest_dot_path(maze, start, goal, cache)
+    assert new_path is not path
+    assert blocked not in cells_of(new_path)
+    assert closest_dot_path(maze, start, goal, cache) is new_path
+
+def test_maze_queries_follow_wall_changes():
+    maze = generate_maze(12, 12, 0.15, 1, seed=1)
+    start, goal = maze.pacman_pos, tuple(maze.food[0])
+    path = maze_queries(maze).path(start, goal)
+    assert maze_queries(maze).path(start, goal).cost == path.cost
+    for blocked in cells_of(path)[1:-1]:
+        maze.walls.add(blocked)
+        if maze_graph(maze).is_open(goal):
+            break
+        maze.walls.discard(blocked)
+    else:
+        pytest.fail("no cell of the path can be walled in")
+    new_path = maze_queries(maze).path(start, goal)
+    assert blocked not in cells_of(new_path)
+
+def test_pooled_queries_match_serial_queries():
+    maze = generate_maze(20, 20, 0.2, 1, seed=0)
+    serial = MazeQueries(maze, workers=1)
+    cells = serial.graph.cells
+    queries = [(start, goal) for start in cells[:10] for goal in cells[-3:]]
+    queries.append(((0,0), cells[0]))      # a wall: no path
+    pooled = MazeQueries(maze, workers=2)
+    pooled.pool_threshold = 2
+    expected = [path and cells_of(path) for path in serial.paths(queries)]
+    assert [path and cells_of(path) for path in pooled.paths(queries)] == expected
+    assert expected[-1] is None
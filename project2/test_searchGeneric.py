@@ -0,0 +1,86 @@
+# test_searchGeneric.py - Tests of the generic searchers
+
+import contextlib
+import io
+import os
+import pytest
+
+pytest.importorskip("pacman")
+pytest.importorskip("display")
+from searchBenchmark import generate_maze
+from searchProblem import Search_problem, Search_problem_from_explicit_graph, Arc
+from searchGeneric import BFSearcher, BeamSearcher, FrontierBeam
+from searchPortfolio import PortfolioSearcher
+from searchMPP import GraphAStarSearcher
+from searchJPS import jump_point_search
+
+def maze_problem(width, height, num_food, seed=0):
+    with contextlib.redirect_stdout(io.StringIO()):     # it prints its arguments
+        return Search_problem(generate_maze(width, height, 0.2, num_food, seed),
+                              lambda n: 1, 'foodHeuristic')
+
+def retained_nodes(searcher):
+    """returns the number of path nodes reachable from the frontier, and
+    the greatest depth of a path in it"""
+    seen = set()
+    depth = 0
+    for (_, _, path) in searcher.frontier.minpq + searcher.frontier.maxpq:
+        depth = max(depth, path.depth)
+        while id(path) not in seen:
+            seen.add(id(path))
+            if path.arc is None:
+                break
+            path = path.initial
+    return len(seen), depth
+
+def test_frontier_beam_heaps_stay_bounded():
+    frontier = FrontierBeam(10)
+    for i in range(10000):
+        frontier.add(i, i % 7)
+        if len(frontier) > 3:
+            frontier.pop()
+        assert len(frontier.minpq) <= 20 and len(frontier.maxpq) <= 20
+        assert len(frontier.removed) <= 40
+
+@pytest.mark.parametrize("num_food", [4, 8])
+def test_beam_search_keeps_width_times_depth_nodes(num_food):
+    width = 20
+    searcher = BeamSearcher(maze_problem(30, 30, num_food), width=width)
+    steps = searcher.search_steps()
+    most_nodes = 0
+    try:
+        for step in range(1000000):
+            next(steps)
+            if step % 10 == 0:
+                (nodes, depth) = retained_nodes(searcher)
+                assert nodes <= 2*width*(depth+1)
+                assert len(searcher.explored) <= searcher.explored_size
+                most_nodes = max(most_nodes, nodes)
+    except StopIteration as stop:
+        (path, _) = stop.value
+    assert searcher.problem.is_goal(path.end())
+    assert len(searcher.store) > 2*most_nodes   # the pruned nodes were freed
+
+class DyingSearcher(BFSearcher):
+    """a searcher whose process dies, as if killed for lack of memory"""
+    def search(self):
+        os._exit(1)
+
+def test_portfolio_does_not_wait_for_a_dead_worker():
+    no_goal = Search_problem_from_explicit_graph({'a','b'}, [Arc('a','b',1)],
+                                                 start='a', goals={'z'})
+    portfolio = PortfolioSearcher(no_goal, {'BFS':BFSearcher, 'dies':DyingSearcher})
+    portfolio.max_display_level = 0
+    (path, _) = portfolio.search()
+    assert path is None
+    assert portfolio.exit_codes == {'dies': 1}
+    assert set(portfolio.results) == {'BFS', 'dies'}
+
+@pytest.mark.parametrize("seed", [59, 0, 1, 2])
+def test_jump_point_search_is_optimal(seed):
+    # on seed 59, AStarSearcher on the jump point problem finds cost 15, not 13
+    with contextlib.redirect_stdout(io.StringIO()):
+        problem = Search_problem(generate_maze(15, 15, 0.25, 1, seed), lambda n: 1, 'h2')
+        (path, _) = jump_point_search(problem)
+        (best, _) = GraphAStarSearcher(problem).search()
+    assert problem.is_goal(path.end()) and path.cost == best.cost